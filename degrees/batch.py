@@ -0,0 +1,125 @@
+import json
+import sys
+import time
+
+import degrees
+
+USAGE = "Usage: python batch.py [directory] [pairs.tsv]"
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit(USAGE)
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory, snapshot=True)
+    degrees.get_name_index()
+    print("Data loaded.", file=sys.stderr)
+
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], encoding="utf-8") as f:
+            run_batch(f, sys.stdout)
+    else:
+        run_batch(sys.stdin, sys.stdout)
+
+
+def run_batch(lines, out):
+    """
+    Answers one query per line of tab-separated source and target names
+    (or "#<person_id>"), writing one JSON object per query to `out` as soon as it is answered.
+    """
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        try:
+            source, target = line.split("\t")
+        except ValueError:
+            result = {"line": number, "error": "expected source<TAB>target"}
+        else:
+            result = answer(source, target)
+            result["line"] = number
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+
+def resolve(name):
+    """
+    Returns (person_id, error) for a name, where error is a JSON-ready
+    dict if the name matches nobody or more than one person.
+
+    Either error lists the best-ranked candidates from find_people.
+    A person id, bare or as "#<person_id>", picks that person without
+    a name lookup, so people who share a name can still be named.
+    """
+    person_id = name[1:] if name.startswith("#") else name
+    if person_id in degrees.people:
+        return person_id, None
+    person_ids = degrees.person_ids_for_name(name)
+    if len(person_ids) == 1:
+        return person_ids[0], None
+    if not person_ids:
+        return None, {
+            "error": "person not found", "name": name,
+            "candidates": describe_people(degrees.find_people(name))
+        }
+    return None, {
+        "error": "ambiguous name", "name": name,
+        "candidates": describe_people(person_ids)
+    }
+
+
+def describe_people(person_ids):
+    """
+    Returns a JSON-ready list of id, name and birth for each person.
+    """
+    candidates = []
+    for person_id in person_ids:
+        person = degrees.people[person_id]
+        candidates.append({
+            "id": person_id, "name": person["name"], "birth": person["birth"]
+        })
+    return candidates
+
+
+def answer(source_name, target_name, mode="csr"):
+    """
+    Returns a JSON-ready dict describing the shortest path between
+    two people given by name.
+    """
+    source, error = resolve(source_name)
+    if error is not None:
+        return error
+    target, error = resolve(target_name)
+    if error is not None:
+        return error
+
+    start = time.perf_counter()
+    path = degrees.shortest_path(source, target, mode=mode)
+    elapsed = time.perf_counter() - start
+
+    result = {"source": source, "target": target,
+              "ms": round(1000 * elapsed, 3)}
+    if path is None:
+        result["degrees"] = None
+        return result
+
+    result["degrees"] = len(path)
+    result["path"] = []
+    person1 = degrees.people[source]["name"]
+    for movie_id, person_id in path:
+        person2 = degrees.people[person_id]["name"]
+        result["path"].append({
+            "person1": person1,
+            "person2": person2,
+            "person_id": person_id,
+            "movie": degrees.movies[movie_id]["title"],
+            "movie_id": movie_id,
+        })
+        person1 = person2
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import inspect
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import batch
+import degrees
+from util import Node, StackFrontier, QueueFrontier
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(usage())
+    command = COMMANDS[sys.argv[1]]
+    parameters = list(inspect.signature(command).parameters.values())
+    if len(sys.argv) - 2 > len(parameters):
+        sys.exit(usage())
+
+    # Arguments take the type of the parameter's default, so numbers
+    # arrive as ints
+    try:
+        arguments = [type(parameter.default)(value)
+                     for parameter, value in zip(parameters, sys.argv[2:])]
+    except ValueError:
+        sys.exit(usage())
+    command(*arguments)
+
+
+def usage():
+    """Returns the usage message, one line per command in COMMANDS."""
+    lines = []
+    for name, command in COMMANDS.items():
+        parameters = inspect.signature(command).parameters
+        lines.append(" ".join(["python benchmark.py", name]
+                              + [f"[{parameter}]" for parameter in parameters]))
+    return "Usage: " + "\n       ".join(lines)
+
+
+def benchmark_searches(directory="large", queries=100):
+    """
+    Prints the explored people and latency per query of every search
+    mode on random pairs, then on pairs that all share one source.
+    """
+    print("Loading data...")
+    degrees.load_data(directory)
+    degrees.load_graph(directory)
+    print("Data loaded.")
+
+    start = time.perf_counter()
+    degrees.build_landmarks()
+    print(f"Landmarks built in {time.perf_counter() - start:.2f}s.")
+
+    pairs = random_pairs(queries)
+    compare_searches(pairs, list(degrees.SEARCH_MODES))
+
+    print()
+    print("Shared source:")
+    source = pairs[0][0]
+    shared = [(source, target) for _, target in pairs]
+    compare_searches(shared, list(degrees.SEARCH_MODES))
+
+
+def compare_stores(directory="large", queries=100):
+    """
+    Prints load time and memory held by the dict-of-dicts store and by
+    the compact Graph, then the per-query latency of a BFS on each.
+
+    The snapshot row runs twice: the first load may have to write the
+    snapshot, the second shows the cached start-up cost. Its memory
+    excludes the mapped arrays, which live in the page cache.
+    """
+    def load_csv_graph(directory):
+        degrees.load_graph(directory, snapshot=False)
+
+    def load_snapshot_graph(directory):
+        degrees.load_graph(directory)
+        degrees.graph.person_index
+
+    print(f"{'store':<16}{'load s':>10}{'MiB':>10}")
+    for store, load in (("dicts", degrees.load_data),
+                        ("graph", load_csv_graph),
+                        ("snapshot", load_snapshot_graph),
+                        ("snapshot", load_snapshot_graph)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        load(directory)
+        elapsed = time.perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{store:<16}{elapsed:>10.2f}{size / 2 ** 20:>10.1f}")
+    print()
+
+    compare_searches(random_pairs(queries), ["bfs", "csr"])
+
+
+def random_pairs(count, seed=0):
+    """
+    Returns `count` random (source, target) pairs of person ids,
+    always the same ones for a given seed.
+    """
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    return [(rng.choice(person_ids), rng.choice(person_ids))
+            for _ in range(count)]
+
+
+def compare_searches(pairs, modes):
+    """
+    Runs every pair through each search mode and prints the average
+    number of people expanded and wall time per query.
+
+    Exits if two modes disagree on the length of a shortest path.
+    """
+    lengths = {}
+    print(f"{'mode':<16}{'explored/query':>16}{'ms/query':>12}")
+    for mode in modes:
+        explored = 0
+        start = time.perf_counter()
+        for source, target in pairs:
+            path = degrees.shortest_path(source, target, mode=mode)
+            explored += degrees.num_explored
+            length = None if path is None else len(path)
+            if lengths.setdefault((source, target), length) != length:
+                sys.exit(f"{mode} disagrees on {source} -> {target}")
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<16}{explored / len(pairs):>16.1f}"
+              f"{1000 * elapsed / len(pairs):>12.3f}")
+
+
+def benchmark_names(directory="large", queries=100):
+    """
+    Prints the time to build the name index and the average latency of
+    exact, prefix and fuzzy lookups for random non-empty names, the fuzzy
+    ones with a typo in each name, and how many of each return the name.
+    """
+    degrees.load_data(directory, snapshot=True)
+    start = time.perf_counter()
+    index = degrees.get_name_index()
+    print(f"Indexed {len(index.keys)} names "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+    rng = random.Random(0)
+    keys = [name for name in index.keys if name]
+    samples = [rng.choice(keys) for _ in range(queries)]
+    typos = []
+    for name in samples:
+        i = rng.randrange(len(name))
+        typos.append(name[:i] + rng.choice("aeiouxyz") + name[i + 1:])
+
+    print(f"{'lookup':<16}{'us/query':>12}{'found':>10}")
+    for lookup, names, search in (
+        ("exact", samples, index.exact),
+        ("prefix", [name[:4] for name in samples], index.prefix),
+        ("fuzzy", typos, index.fuzzy),
+    ):
+        start = time.perf_counter()
+        results = [search(name) for name in names]
+        elapsed = time.perf_counter() - start
+
+        # exact returns person ids; prefix and fuzzy return matches
+        # that start with the matched name
+        if lookup == "exact":
+            found = sum(bool(result) for result in results)
+        else:
+            found = sum(any(match[0] == name for match in result)
+                        for name, result in zip(samples, results))
+        print(f"{lookup:<16}{1e6 * elapsed / len(names):>12.1f}"
+              f"{found:>10}")
+    print(f"found: lookups out of {len(samples)} returning the intended name")
+
+
+def benchmark_frontiers(size=1000000):
+    """
+    Times add, contains_state and remove on each frontier class at
+    growing sizes up to `size` nodes.
+
+    Constant-time operations show up as a flat ns/op column.
+    """
+    sizes = []
+    n = 1000
+    while n < size:
+        sizes.append(n)
+        n *= 10
+    sizes.append(size)
+
+    print(f"{'frontier':<16}{'nodes':>10}{'add ns/op':>12}"
+          f"{'contains ns/op':>16}{'remove ns/op':>14}")
+    for frontier_class in (StackFrontier, QueueFrontier):
+        for n in sizes:
+            nodes = [Node(state=i, parent=None, action=None) for i in range(n)]
+            probes = random.Random(0).sample(range(2 * n), min(n, 100000))
+            frontier = frontier_class()
+
+            start = time.perf_counter()
+            for node in nodes:
+                frontier.add(node)
+            add = (time.perf_counter() - start) / n
+
+            start = time.perf_counter()
+            for state in probes:
+                frontier.contains_state(state)
+            contains = (time.perf_counter() - start) / len(probes)
+
+            start = time.perf_counter()
+            while not frontier.empty():
+                frontier.remove()
+            remove = (time.perf_counter() - start) / n
+
+            print(f"{frontier_class.__name__:<16}{n:>10}{add * 1e9:>12.0f}"
+                  f"{contains * 1e9:>16.0f}{remove * 1e9:>14.0f}")
+
+
+def verify_resolve():
+    """
+    Checks that batch.resolve reports a name two people share as
+    ambiguous and picks each of them by id, bare or as "#<person_id>",
+    on a tiny dataset written for the purpose and loaded the way batch.py
+    loads it. Exits on the first failure.
+    """
+    files = {
+        "people.csv": 'id,name,birth\n1,"Pat Doe",1950\n'
+                      '2,"Pat Doe",1980\n3,"Sam Roe",1970\n',
+        "movies.csv": 'id,title,year\n10,"First",2000\n20,"Second",2001\n',
+        "stars.csv": "person_id,movie_id\n1,10\n3,10\n2,20\n",
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in files.items():
+            with open(os.path.join(directory, name), "w",
+                      encoding="utf-8") as f:
+                f.write(text)
+        degrees.load_data(directory, snapshot=True)
+        _, error = batch.resolve("Pat Doe")
+        if error is None or error["error"] != "ambiguous name":
+            sys.exit("shared name not reported as ambiguous")
+        for name, expected in (("#1", "1"), ("2", "2"), ("#3", "3")):
+            person_id, error = batch.resolve(name)
+            if person_id != expected:
+                sys.exit(f"{name} resolved to {person_id}, {error}")
+        if batch.answer("#1", "Sam Roe")["degrees"] != 1:
+            sys.exit("no path from #1 to Sam Roe")
+        if batch.answer("#2", "Sam Roe")["degrees"] is not None:
+            sys.exit("#2 should not reach Sam Roe")
+    print("Names shared by several people resolve by id.")
+
+
+# Function run by each command, given the command line arguments after
+# the command name
+COMMANDS = {
+    "search": benchmark_searches,
+    "store": compare_stores,
+    "names": benchmark_names,
+    "frontier": benchmark_frontiers,
+    "verify": verify_resolve,
+}
+
+
+if __name__ == "__main__":
+    main()
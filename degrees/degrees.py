@@ -1,6 +1,13 @@
 import csv
+import heapq
+import itertools
+import math
 import sys
+from collections import OrderedDict, deque
 
+from graph import Graph, PeopleView, MoviesView, NamesView, load_snapshot
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -12,11 +19,43 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Compact integer-indexed copy of the same data, see load_graph
+graph = None
 
-def load_data(directory):
+# Prefix and fuzzy name lookup, built on first use by get_name_index
+name_index = None
+
+# Maps recent source person_ids to the (distances, parents) of
+# single_source, least recently used first
+single_source_cache = OrderedDict()
+SINGLE_SOURCE_CACHE_SIZE = 16
+
+# Landmark distances used by the "astar" search mode, see build_landmarks
+landmark_index = None
+
+# Number of people expanded by the most recent search
+num_explored = 0
+
+
+def load_data(directory, snapshot=False):
     """
     Load data from CSV files into memory.
+
+    With `snapshot`, load the compact Graph through its binary snapshot
+    instead and point people, movies and names at read-only views of it.
     """
+    global names, people, movies, name_index, landmark_index
+    single_source_cache.clear()
+    name_index = None
+    landmark_index = None
+    if snapshot:
+        load_graph(directory)
+        names = NamesView(graph)
+        people = PeopleView(graph)
+        movies = MoviesView(graph)
+        return
+    names, people, movies = {}, {}, {}
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -52,6 +91,17 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory, snapshot=True):
+    """
+    Load data into a compact Graph for the "csr" search mode.
+
+    With `snapshot`, reuse the binary snapshot next to the CSV files when
+    it is up to date, and write one when it is not.
+    """
+    global graph
+    graph = load_snapshot(directory) if snapshot else Graph.load(directory)
+
+
 def main():
     if len(sys.argv) > 2:
         sys.exit("Usage: python degrees.py [directory]")
@@ -59,7 +109,7 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, snapshot=True)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +119,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode="csr")
 
     if path is None:
         print("Not connected.")
@@ -84,13 +134,29 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+
+    `mode` selects the search used; see SEARCH_MODES.
     """
+    try:
+        search = SEARCH_MODES[mode]
+    except KeyError:
+        raise ValueError(f"unknown search mode {mode!r}")
+    return search(source, target)
+
+
+def breadth_first_path(source, target):
+    """
+    Returns the shortest path from source to target using a
+    breadth-first search that grows outward from the source only.
+    """
+    global num_explored
+    num_explored = 0
 
     # Initialize frontier to just the starting position
     start = Node(state=source, parent=None, action=None)
@@ -113,6 +179,7 @@ def shortest_path(source, target):
 
         # Choose a node from the frontier
         node = frontier.remove()
+        num_explored += 1
 
         # If node is the goal, then we have a solution
         if node.state == target:
@@ -142,12 +209,331 @@ def shortest_path(source, target):
     raise NotImplementedError
 
 
+def optimized_path(source, target):
+    """
+    Returns the shortest path from source to target using a breadth-first
+    search that tests for the goal as soon as a person is reached, and
+    scans each movie's cast at most once.
+
+    Any co-star reached through an already expanded movie was already
+    reached through it, so skipping the movie loses nothing.
+    """
+    global num_explored
+    num_explored = 0
+    if source == target:
+        return []
+
+    parents = {source: None}
+    expanded_movies = set()
+    frontier = deque([source])
+    while frontier:
+        person_id = frontier.popleft()
+        num_explored += 1
+        for movie_id in people[person_id]["movies"]:
+            if movie_id in expanded_movies:
+                continue
+            expanded_movies.add(movie_id)
+            for neighbor in movies[movie_id]["stars"]:
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (movie_id, person_id)
+                if neighbor == target:
+                    return path_from_parents(parents, target)
+                frontier.append(neighbor)
+    return None
+
+
+def bidirectional_path(source, target):
+    """
+    Returns the shortest path from source to target by growing one
+    breadth-first frontier from each end and joining them where they meet.
+
+    Each round expands a whole layer of whichever frontier is smaller, so
+    the search only ever reaches about half the separation from either end.
+    """
+    global num_explored
+    num_explored = 0
+
+    if source == target:
+        return []
+
+    # Each side maps a person to (movie_id, person_id) one step back
+    # towards where that side started
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Always expand the cheaper side
+        if len(forward_layer) <= len(backward_layer):
+            layer, visited, other = forward_layer, forward, backward
+        else:
+            layer, visited, other = backward_layer, backward, forward
+
+        next_layer = []
+        meeting = None
+        for person_id in layer:
+            num_explored += 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor in visited:
+                    continue
+                visited[neighbor] = (movie_id, person_id)
+                next_layer.append(neighbor)
+                if neighbor in other:
+                    meeting = neighbor
+                    break
+            if meeting is not None:
+                break
+
+        if meeting is not None:
+            return join_paths(forward, backward, meeting)
+
+        if visited is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Builds the (movie_id, person_id) path through `meeting` from the
+    parent maps of a bidirectional search.
+    """
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent
+    path.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, child = backward[person_id]
+        path.append((movie_id, child))
+        person_id = child
+    return path
+
+
+def cached_path(source, target):
+    """
+    Returns the shortest path from source to target out of the
+    single_source result for source, computing it on first use.
+    """
+    distances, parents = single_source(source)
+    return path_from_parents(parents, target)
+
+
+def astar_path(source, target):
+    """
+    Returns the shortest path from source to target using A* search,
+    with the landmark lower bound as an admissible heuristic.
+
+    Pairs the landmarks prove disconnected return None without searching.
+    """
+    global num_explored
+    num_explored = 0
+    if landmark_index is None:
+        raise Exception("landmarks not built; call build_landmarks first")
+    if landmark_index.lower_bound(source, target) == math.inf:
+        return None
+
+    # Frontier entries are (cost + estimate, tie breaker, person_id);
+    # costs maps each reached person to the best known cost so far
+    counter = itertools.count()
+    frontier = [(landmark_index.lower_bound(source, target),
+                 next(counter), source)]
+    costs = {source: 0}
+    parents = {source: None}
+    explored = set()
+
+    while frontier:
+        _, _, person_id = heapq.heappop(frontier)
+        if person_id in explored:
+            continue
+        if person_id == target:
+            return path_from_parents(parents, target)
+        explored.add(person_id)
+        num_explored += 1
+
+        cost = costs[person_id] + 1
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in explored or cost >= costs.get(neighbor, math.inf):
+                continue
+            costs[neighbor] = cost
+            parents[neighbor] = (movie_id, person_id)
+            estimate = cost + landmark_index.lower_bound(neighbor, target)
+            heapq.heappush(frontier, (estimate, next(counter), neighbor))
+
+    return None
+
+
+def csr_path(source, target):
+    """
+    Returns the shortest path from source to target using a breadth-first
+    search over the integer adjacency arrays of the loaded Graph.
+    """
+    global num_explored
+    if graph is None:
+        raise Exception("graph not loaded; call load_graph first")
+    path = graph.shortest_path(source, target)
+    num_explored = graph.num_explored
+    return path
+
+
+SEARCH_MODES = {
+    "bfs": breadth_first_path,
+    "optimized": optimized_path,
+    "bidirectional": bidirectional_path,
+    "csr": csr_path,
+    "cached": cached_path,
+    "astar": astar_path,
+}
+
+
+def single_source(source):
+    """
+    Returns (distances, parents) for everyone reachable from source,
+    found in one breadth-first pass and cached for later calls
+    (the most recent SINGLE_SOURCE_CACHE_SIZE sources are kept).
+
+    distances maps each person_id to its degrees of separation from
+    source; parents maps it to the (movie_id, person_id) step back
+    towards source, or None for source itself.
+
+    Sets num_explored to the people expanded, 0 when cached.
+    """
+    global num_explored
+    num_explored = 0
+    if source in single_source_cache:
+        single_source_cache.move_to_end(source)
+        return single_source_cache[source]
+
+    distances = {source: 0}
+    parents = {source: None}
+    layer = [source]
+    while layer:
+        next_layer = []
+        for person_id in layer:
+            num_explored += 1
+            for movie_id, neighbor in neighbors_for_person(person_id):
+                if neighbor not in distances:
+                    distances[neighbor] = distances[person_id] + 1
+                    parents[neighbor] = (movie_id, person_id)
+                    next_layer.append(neighbor)
+        layer = next_layer
+
+    single_source_cache[source] = (distances, parents)
+    if len(single_source_cache) > SINGLE_SOURCE_CACHE_SIZE:
+        single_source_cache.popitem(last=False)
+    return distances, parents
+
+
+def path_from_parents(parents, target):
+    """
+    Returns the (movie_id, person_id) path to target recorded in the
+    parents of a single_source result, or None if target was not reached.
+    """
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        movie_id, parent = parents[target]
+        path.append((movie_id, target))
+        target = parent
+    path.reverse()
+    return path
+
+
+def build_landmarks(k=8):
+    """
+    Runs single_source from the k people with the most movies and keeps
+    their distances as the landmark index.
+    """
+    global landmark_index
+    if isinstance(people, PeopleView):
+
+        # Read movie counts off the graph's offsets rather than building
+        # every person's movie set
+        offsets = graph.person_offsets
+        counts = zip(graph.person_ids,
+                     (offsets[p + 1] - offsets[p]
+                      for p in range(len(offsets) - 1)))
+    else:
+        counts = ((person_id, len(person["movies"]))
+                  for person_id, person in people.items())
+    hubs = [person_id for person_id, _ in
+            heapq.nlargest(k, counts, key=lambda item: item[1])]
+    landmark_index = LandmarkIndex(
+        {hub: single_source(hub)[0] for hub in hubs}
+    )
+
+
+def separation_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    source and target without searching; math.inf means not connected
+    (lower) or unknown (upper).
+
+    Exact when either person has a cached single_source result.
+    """
+    for a, b in ((source, target), (target, source)):
+        if a in single_source_cache:
+            distance = single_source_cache[a][0].get(b, math.inf)
+            return distance, distance
+    if landmark_index is None:
+        return 0, math.inf
+    return (landmark_index.lower_bound(source, target),
+            landmark_index.upper_bound(source, target))
+
+
+def get_name_index():
+    """
+    Returns the NameIndex over the loaded people, building it once.
+    """
+    global name_index
+    if name_index is None:
+        if isinstance(people, PeopleView):
+            entries = zip(graph.person_ids, graph.person_names)
+        else:
+            entries = ((person_id, person["name"])
+                       for person_id, person in people.items())
+        name_index = NameIndex(entries)
+    return name_index
+
+
+def find_people(name, limit=10):
+    """
+    Returns up to `limit` person_ids ranked by how well their name
+    matches: exact matches, then names starting with `name`, then the
+    closest fuzzy matches. Never prompts.
+    """
+    index = get_name_index()
+    ranked = index.exact(name)
+    for _, person_ids in index.prefix(name, limit):
+        ranked.extend(person_ids)
+    for _, person_ids, _ in index.fuzzy(name, limit):
+        ranked.extend(person_ids)
+    return list(dict.fromkeys(ranked))[:limit]
+
+
+def person_ids_for_name(name):
+    """
+    Returns every IMDB id for a person's name, without prompting.
+    """
+    return sorted(names.get(name.lower(), set()))
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = person_ids_for_name(name)
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
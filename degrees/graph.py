@@ -0,0 +1,529 @@
+import csv
+import hashlib
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from functools import cached_property
+
+# File name of the snapshot written next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGSNAP1"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+
+class Graph():
+    """
+    Compact, integer-indexed store for the degrees dataset.
+
+    Person and movie ids are interned to dense integers in load order.
+    The star relation is kept twice in CSR form: the movies of person p
+    are person_movies[person_offsets[p]:person_offsets[p + 1]], and the
+    stars of movie m are movie_people[movie_offsets[m]:movie_offsets[m + 1]].
+    """
+
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Number of people expanded by the most recent search
+        self.num_explored = 0
+
+    @cached_property
+    def person_index(self):
+        """Maps IMDb person ids to person indices."""
+        return {person_id: i for i, person_id in enumerate(self.person_ids)}
+
+    @cached_property
+    def movie_index(self):
+        """Maps IMDb movie ids to movie indices."""
+        return {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Builds a graph straight from the CSV files in `directory`,
+        without going through the dict-of-dicts store.
+        """
+        person_ids, person_names, person_births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for person_id, name, birth in reader:
+                if person_id in person_index:
+                    continue
+                person_index[person_id] = len(person_ids)
+                person_ids.append(person_id)
+                person_names.append(name)
+                person_births.append(birth)
+
+        movie_ids, movie_titles, movie_years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for movie_id, title, year in reader:
+                if movie_id in movie_index:
+                    continue
+                movie_index[movie_id] = len(movie_ids)
+                movie_ids.append(movie_id)
+                movie_titles.append(title)
+                movie_years.append(year)
+
+        # Encode each (person, movie) edge as one integer so that sorting
+        # both removes duplicates and groups the edges by person
+        num_movies = len(movie_ids)
+        edges = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for person_id, movie_id in reader:
+                p = person_index.get(person_id)
+                m = movie_index.get(movie_id)
+                if p is not None and m is not None:
+                    edges.add(p * num_movies + m)
+        edges = sorted(edges)
+
+        person_offsets, person_movies, movie_offsets, movie_people = (
+            build_adjacency(edges, len(person_ids), num_movies)
+        )
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Opens a snapshot written by save, memory-mapping its arrays.
+
+        Returns (graph, header). Raises ValueError if the file is not
+        a snapshot this machine can read.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+        if bytes(view[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError("not a degrees snapshot")
+        start = len(SNAPSHOT_MAGIC) + 8
+        length = int.from_bytes(view[len(SNAPSHOT_MAGIC):start], "little")
+        if start + length > len(view):
+            raise ValueError("truncated snapshot")
+        header = json.loads(bytes(view[start:start + length]))
+        if (header["byteorder"] != sys.byteorder
+                or header["itemsize"] != array("i").itemsize):
+            raise ValueError("snapshot written on an incompatible machine")
+
+        # A truncated or damaged file must not reach cast, which raises
+        # TypeError on a length that is not a multiple of the item size
+        sections = {}
+        for name, (offset, size, typecode) in header["sections"].items():
+            if (offset < start + length or offset + size > len(view)
+                    or size % array(typecode).itemsize):
+                raise ValueError("truncated snapshot")
+            sections[name] = view[offset:offset + size].cast(typecode)
+
+        def strings(name):
+            return StringTable(sections[f"{name}.data"],
+                               sections[f"{name}.offsets"])
+
+        graph = cls(strings("person_ids"), strings("person_names"),
+                    strings("person_births"), strings("movie_ids"),
+                    strings("movie_titles"), strings("movie_years"),
+                    sections["person_offsets"], sections["person_movies"],
+                    sections["movie_offsets"], sections["movie_people"])
+        return graph, header
+
+    def save(self, path, sources):
+        """
+        Writes the graph to a binary snapshot at `path`.
+
+        `sources` describes the files the graph was built from and is
+        stored in the header so stale snapshots can be detected.
+        """
+        sections = {}
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years"):
+            data, offsets = encode_strings(getattr(self, name))
+            sections[f"{name}.data"] = (data, "B")
+            sections[f"{name}.offsets"] = (offsets, "q")
+        for name in ("person_offsets", "person_movies",
+                     "movie_offsets", "movie_people"):
+            sections[name] = (bytes(getattr(self, name)), "i")
+
+        # Lay sections out 8-byte aligned after the header so every array
+        # can be cast in place; the header holds the section offsets, so
+        # grow its slot until the offsets it records fit in front of them
+        layout = {}
+        offset = 0
+        for name, (data, typecode) in sections.items():
+            layout[name] = (offset, len(data), typecode)
+            offset += len(data) + -len(data) % 8
+        header = {
+            "byteorder": sys.byteorder,
+            "itemsize": array("i").itemsize,
+            "sources": sources,
+        }
+        base = 0
+        while True:
+            header["sections"] = {
+                name: [base + offset, size, typecode]
+                for name, (offset, size, typecode) in layout.items()
+            }
+            encoded = json.dumps(header).encode()
+            needed = len(SNAPSHOT_MAGIC) + 8 + len(encoded)
+            needed += -needed % 8
+            if needed <= base:
+                break
+            base = needed
+        encoded = encoded.ljust(base - len(SNAPSHOT_MAGIC) - 8)
+
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(encoded).to_bytes(8, "little"))
+            f.write(encoded)
+            for data, _ in sections.values():
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+        os.replace(temporary, path)
+
+    def movies_for_person(self, p):
+        """Returns the movie indices person index `p` starred in."""
+        return self.person_movies[
+            self.person_offsets[p]:self.person_offsets[p + 1]
+        ]
+
+    def stars_for_movie(self, m):
+        """Returns the person indices who starred in movie index `m`."""
+        return self.movie_people[
+            self.movie_offsets[m]:self.movie_offsets[m + 1]
+        ]
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target, given as IMDb person ids.
+
+        If no possible path, returns None.
+        """
+        path = self.index_path(self.person_index[source],
+                               self.person_index[target])
+        if path is None:
+            return None
+        return [(self.movie_ids[m], self.person_ids[p]) for m, p in path]
+
+    def index_path(self, source, target):
+        """
+        Returns the shortest list of (movie index, person index) pairs
+        that connect two person indices, or None if there is no path.
+
+        Only touches the adjacency arrays, so it works on a graph opened
+        from a snapshot without building any id lookup tables.
+        """
+        self.num_explored = 0
+        if source == target:
+            return []
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+
+        # Parent person and connecting movie of every reached person;
+        # -1 marks people not reached yet
+        parent = array("i", [-1]) * len(person_offsets)
+        via = array("i", [-1]) * len(person_offsets)
+        parent[source] = source
+
+        # Each movie's cast only needs scanning the first time it is met
+        expanded = bytearray(len(movie_offsets))
+
+        frontier = deque([source])
+        while frontier:
+            p = frontier.popleft()
+            self.num_explored += 1
+            for i in range(person_offsets[p], person_offsets[p + 1]):
+                m = person_movies[i]
+                if expanded[m]:
+                    continue
+                expanded[m] = 1
+                for j in range(movie_offsets[m], movie_offsets[m + 1]):
+                    q = movie_people[j]
+                    if parent[q] != -1:
+                        continue
+                    parent[q] = p
+                    via[q] = m
+                    if q == target:
+                        return build_path(parent, via, source, target)
+                    frontier.append(q)
+        return None
+
+
+def build_path(parent, via, source, target):
+    """
+    Follows parent pointers back from target to source and returns
+    the path as (movie index, person index) pairs.
+    """
+    path = []
+    p = target
+    while p != source:
+        path.append((via[p], p))
+        p = parent[p]
+    path.reverse()
+    return path
+
+
+def build_adjacency(edges, num_people, num_movies):
+    """
+    Given sorted, distinct edge keys p * num_movies + m, returns
+    (person_offsets, person_movies, movie_offsets, movie_people) arrays.
+    """
+    person_offsets = array("i", [0]) * (num_people + 1)
+    person_movies = array("i", [0]) * len(edges)
+    movie_counts = array("i", [0]) * (num_movies + 1)
+    for i, edge in enumerate(edges):
+        p, m = divmod(edge, num_movies)
+        person_offsets[p + 1] += 1
+        person_movies[i] = m
+        movie_counts[m + 1] += 1
+    for p in range(num_people):
+        person_offsets[p + 1] += person_offsets[p]
+
+    # Counting sort the same edges by movie
+    movie_offsets = array("i", movie_counts)
+    for m in range(num_movies):
+        movie_offsets[m + 1] += movie_offsets[m]
+    movie_people = array("i", [0]) * len(edges)
+    position = array("i", movie_offsets)
+    for edge in edges:
+        p, m = divmod(edge, num_movies)
+        movie_people[position[m]] = p
+        position[m] += 1
+
+    return person_offsets, person_movies, movie_offsets, movie_people
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 buffer plus an
+    array of byte offsets, decoded one item at a time on access.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        return bytes(self.data[self.offsets[i]:self.offsets[i + 1]]).decode()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def encode_strings(strings):
+    """
+    Returns (data, offsets) bytes for a StringTable holding `strings`.
+    """
+    offsets = array("q", [0])
+    parts = []
+    size = 0
+    for string in strings:
+        encoded = string.encode()
+        parts.append(encoded)
+        size += len(encoded)
+        offsets.append(size)
+    return b"".join(parts), bytes(offsets)
+
+
+def source_stats(directory):
+    """
+    Returns the size and modification time of each CSV file in `directory`.
+    """
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return stats
+
+
+def file_digest(path):
+    """Returns the SHA-256 hex digest of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def snapshot_is_current(header, directory, stats):
+    """
+    Checks whether a snapshot header still matches the CSV files.
+
+    Files whose size and mtime are unchanged are trusted; a file with
+    the same size but a new mtime is compared by content hash.
+    """
+    recorded = header["sources"]
+    for name, stat in stats.items():
+        if name not in recorded or recorded[name]["size"] != stat["size"]:
+            return False
+        if recorded[name]["mtime_ns"] != stat["mtime_ns"]:
+            digest = file_digest(os.path.join(directory, name))
+            if recorded[name]["sha256"] != digest:
+                return False
+    return True
+
+
+def has_current_snapshot(directory):
+    """
+    Checks whether `directory` holds a readable snapshot that matches
+    its CSV files, so that opening it gives the graph load_snapshot
+    returns.
+    """
+    try:
+        _, header = Graph.open(os.path.join(directory, SNAPSHOT))
+        return snapshot_is_current(header, directory, source_stats(directory))
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def load_snapshot(directory):
+    """
+    Returns the Graph for the CSV files in `directory`.
+
+    Opens the snapshot next to the CSVs when it is up to date; otherwise
+    parses the CSVs and writes a fresh snapshot for the next run.
+    Damaged snapshots are treated as stale.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    stats = source_stats(directory)
+    try:
+        graph, header = Graph.open(path)
+        if snapshot_is_current(header, directory, stats):
+            recorded = header["sources"]
+            if any(recorded[name]["mtime_ns"] != stat["mtime_ns"]
+                   for name, stat in stats.items()):
+
+                # The files were touched but hash the same; record their
+                # new mtimes so later runs need not hash them again
+                for name, stat in stats.items():
+                    stat["sha256"] = recorded[name]["sha256"]
+                try:
+                    graph.save(path, stats)
+                except OSError:
+                    pass
+            return graph
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    graph = Graph.load(directory)
+    for name, stat in stats.items():
+        stat["sha256"] = file_digest(os.path.join(directory, name))
+    try:
+        graph.save(path, stats)
+    except OSError:
+        # A read-only data directory just means no cache
+        pass
+    return graph
+
+
+class PeopleView(Mapping):
+    """
+    Read-only view of a Graph shaped like the `people` dict in degrees.py.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        p = self.graph.person_index[person_id]
+        return {
+            "name": self.graph.person_names[p],
+            "birth": self.graph.person_births[p],
+            "movies": {self.graph.movie_ids[m]
+                       for m in self.graph.movies_for_person(p)},
+        }
+
+    def __contains__(self, person_id):
+        return person_id in self.graph.person_index
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class MoviesView(Mapping):
+    """
+    Read-only view of a Graph shaped like the `movies` dict in degrees.py.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        m = self.graph.movie_index[movie_id]
+        return {
+            "title": self.graph.movie_titles[m],
+            "year": self.graph.movie_years[m],
+            "stars": {self.graph.person_ids[p]
+                      for p in self.graph.stars_for_movie(m)},
+        }
+
+    def __contains__(self, movie_id):
+        return movie_id in self.graph.movie_index
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class NamesView(Mapping):
+    """
+    Read-only view of a Graph shaped like the `names` dict in degrees.py,
+    built on first use.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    @cached_property
+    def names(self):
+        names = {}
+        for person_id, name in zip(self.graph.person_ids,
+                                   self.graph.person_names):
+            names.setdefault(name.lower(), set()).add(person_id)
+        return names
+
+    def __getitem__(self, name):
+        return self.names[name]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
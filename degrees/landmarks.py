@@ -0,0 +1,43 @@
+import math
+
+
+class LandmarkIndex():
+    """
+    Distances from a few landmark people to everyone they can reach.
+
+    By the triangle inequality, for any landmark L the separation between
+    a and b is at least |d(L, a) - d(L, b)| and at most d(L, a) + d(L, b).
+    """
+
+    def __init__(self, distances):
+        # Maps each landmark person_id to a dict of person_id -> distance
+        self.distances = distances
+
+    def lower_bound(self, a, b):
+        """
+        Returns a lower bound on the separation between a and b,
+        or math.inf if some landmark proves they are not connected.
+        """
+        bound = 0
+        for distance in self.distances.values():
+            da = distance.get(a)
+            db = distance.get(b)
+            if da is None and db is None:
+                continue
+            if da is None or db is None:
+                return math.inf
+            bound = max(bound, abs(da - db))
+        return bound
+
+    def upper_bound(self, a, b):
+        """
+        Returns an upper bound on the separation between a and b,
+        or math.inf if no landmark reaches both.
+        """
+        bound = math.inf
+        for distance in self.distances.values():
+            da = distance.get(a)
+            db = distance.get(b)
+            if da is not None and db is not None:
+                bound = min(bound, da + db)
+        return bound
@@ -0,0 +1,108 @@
+import bisect
+from array import array
+from collections import Counter
+
+# Fuzzy search stops adding trigram posting lists once this many
+# candidate entries have been counted
+CANDIDATE_BUDGET = 2000
+
+# Candidates with the most shared trigrams that get an exact score
+CANDIDATES_SCORED = 64
+
+# Fuzzy matches scoring below this are not worth suggesting
+MIN_SCORE = 0.3
+
+
+class NameIndex():
+    """
+    Lookup structure over people's names, built once.
+
+    Distinct lowercased names are kept in a sorted list for exact and
+    prefix search, and a trigram index maps every three-character slice
+    to the positions of the names containing it for fuzzy search.
+    """
+
+    def __init__(self, people):
+        """
+        Builds the index from an iterable of (person_id, name) pairs.
+        """
+        groups = {}
+        for person_id, name in people:
+            groups.setdefault(name.lower(), []).append(person_id)
+        self.keys = sorted(groups)
+        self.person_ids = [groups[key] for key in self.keys]
+
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for trigram in trigrams(key):
+                postings.setdefault(trigram, []).append(i)
+        self.postings = {
+            trigram: array("i", positions)
+            for trigram, positions in postings.items()
+        }
+
+    def exact(self, name):
+        """Returns the person_ids whose name is exactly `name`."""
+        key = name.lower()
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return list(self.person_ids[i])
+        return []
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` (name, person_ids) pairs whose name starts
+        with `prefix`, in alphabetical order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect.bisect_left(self.keys, prefix)
+        while (i < len(self.keys) and len(matches) < limit
+               and self.keys[i].startswith(prefix)):
+            matches.append((self.keys[i], list(self.person_ids[i])))
+            i += 1
+        return matches
+
+    def fuzzy(self, name, limit=10):
+        """
+        Returns up to `limit` (name, person_ids, score) triples for the
+        names most similar to `name`, best first.
+
+        The score is the Jaccard similarity of the two trigram sets;
+        matches below MIN_SCORE are dropped.
+        Candidates are gathered from the query's rarest trigrams first,
+        so common trigrams never force a scan of most of the index.
+        """
+        query = trigrams(name.lower())
+        lists = sorted(
+            (self.postings[trigram] for trigram in query
+             if trigram in self.postings),
+            key=len
+        )
+
+        counts = Counter()
+        counted = 0
+        for positions in lists:
+            if counted and counted + len(positions) > CANDIDATE_BUDGET:
+                break
+            counted += len(positions)
+            counts.update(positions)
+
+        scored = []
+        for i, _ in counts.most_common(CANDIDATES_SCORED):
+            grams = trigrams(self.keys[i])
+            score = len(query & grams) / len(query | grams)
+            if score >= MIN_SCORE:
+                scored.append((score, i))
+        scored.sort(key=lambda item: (-item[0], self.keys[item[1]]))
+        return [(self.keys[i], list(self.person_ids[i]), score)
+                for score, i in scored[:limit]]
+
+
+def trigrams(name):
+    """
+    Returns the set of three-character slices of a name, padded so that
+    its first and last letters each start or end a trigram too.
+    """
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,118 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+
+from graph import SNAPSHOT, Graph, has_current_snapshot, load_snapshot
+
+USAGE = "Usage: python parallel.py [directory] [queries] [max_workers]"
+
+# Graph opened by each worker process from the shared snapshot file
+worker_graph = None
+
+
+def open_worker_graph(path):
+    """
+    Pool initializer: memory-maps the snapshot in the worker, so every
+    process reads the same page-cache copy of the adjacency arrays.
+    """
+    global worker_graph
+    worker_graph, _ = Graph.open(path)
+
+
+def solve_indices(pair):
+    """
+    Runs one query in a worker, on person indices rather than ids so
+    that the worker never builds the id lookup tables.
+    """
+    source, target = pair
+    return worker_graph.index_path(source, target)
+
+
+class ParallelSolver():
+    """
+    Answers batches of shortest-path queries across a pool of worker
+    processes that share one memory-mapped copy of the graph.
+    """
+
+    def __init__(self, directory, workers=None):
+        self.graph = load_snapshot(directory)
+        self.path = os.path.join(directory, SNAPSHOT)
+        self.temporary = None
+
+        # load_snapshot skips writing when the directory is read-only,
+        # which can leave no snapshot or a stale one; the workers must map
+        # the same graph as this process, so write one elsewhere
+        if not has_current_snapshot(directory):
+            fd, self.temporary = tempfile.mkstemp(suffix=".snapshot")
+            os.close(fd)
+            self.graph.save(self.temporary, {})
+            self.path = self.temporary
+
+        self.workers = workers or os.cpu_count()
+        self.pool = Pool(self.workers, initializer=open_worker_graph,
+                         initargs=(self.path,))
+
+    def solve(self, pairs):
+        """
+        Returns the shortest path for every (source, target) pair of
+        IMDb person ids, in order, as shortest_path would.
+        """
+        index = self.graph.person_index
+        jobs = [(index[source], index[target]) for source, target in pairs]
+        chunksize = max(1, len(jobs) // (4 * self.workers))
+        paths = []
+        for path in self.pool.imap(solve_indices, jobs, chunksize):
+            if path is not None:
+                path = [(self.graph.movie_ids[m], self.graph.person_ids[p])
+                        for m, p in path]
+            paths.append(path)
+        return paths
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        if self.temporary is not None:
+            os.remove(self.temporary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit(USAGE)
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    queries = int(sys.argv[2]) if len(sys.argv) >= 3 else 1000
+    max_workers = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    print("Loading data...")
+    graph = load_snapshot(directory)
+    print("Data loaded.")
+
+    rng = random.Random(0)
+    pairs = [(rng.choice(graph.person_ids), rng.choice(graph.person_ids))
+             for _ in range(queries)]
+
+    print(f"{'workers':>8}{'queries/s':>12}{'speedup':>10}")
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        with ParallelSolver(directory, workers) as solver:
+
+            # Let every worker map the snapshot before timing
+            solver.solve(pairs[:workers])
+            start = time.perf_counter()
+            solver.solve(pairs)
+            elapsed = time.perf_counter() - start
+        rate = queries / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>8}{rate:>12.1f}{rate / baseline:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
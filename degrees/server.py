@@ -0,0 +1,119 @@
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+from batch import answer, describe_people
+
+USAGE = "Usage: python server.py [directory] [port]"
+
+
+class SeparationHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET /separation?source=NAME&target=NAME with the JSON that
+    batch.py writes for the same pair, and POST /separation with a body
+    of tab-separated pairs, one JSON line per pair.
+
+    GET /people?name=NAME[&limit=N] returns ranked name matches.
+    Wherever a NAME is expected, "#<person_id>" names one person.
+    """
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/people":
+            self.find_people(query)
+            return
+        if url.path != "/separation":
+            self.send_json(404, {"error": "not found"})
+            return
+        if "source" not in query or "target" not in query:
+            self.send_json(400, {"error": "source and target are required"})
+            return
+        self.send_json(200, answer(query["source"][0], query["target"][0]))
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/separation":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_json(400, {"error": "bad Content-Length"})
+            return
+        try:
+            lines = self.rfile.read(length).decode("utf-8").splitlines()
+        except UnicodeDecodeError:
+            self.send_json(400, {"error": "body must be UTF-8"})
+            return
+        results = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                source, target = line.split("\t")
+            except ValueError:
+                results.append({"error": "expected source<TAB>target"})
+            else:
+                results.append(answer(source, target))
+        body = "".join(json.dumps(result) + "\n" for result in results)
+        self.send_body(200, body.encode("utf-8"), "application/x-ndjson")
+
+    def find_people(self, query):
+        if "name" not in query:
+            self.send_json(400, {"error": "name is required"})
+            return
+        try:
+            limit = int(query.get("limit", ["10"])[0])
+        except ValueError:
+            self.send_json(400, {"error": "limit must be an integer"})
+            return
+        person_ids = degrees.find_people(query["name"][0], limit)
+        self.send_json(200, {"candidates": describe_people(person_ids)})
+
+    def send_json(self, status, result):
+        body = json.dumps(result).encode("utf-8")
+        self.send_body(status, body, "application/json")
+
+    def send_body(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit(USAGE)
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    port = int(sys.argv[2]) if len(sys.argv) == 3 else 8050
+
+    print("Loading data...")
+    degrees.load_data(directory, snapshot=True)
+
+    # Build the lazy lookup tables now rather than inside the first requests
+    degrees.graph.person_index
+    degrees.graph.movie_index
+    degrees.names.get("")
+    degrees.get_name_index()
+    print("Data loaded.")
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), SeparationHandler)
+    print(f"Serving on http://127.0.0.1:{port}/separation")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
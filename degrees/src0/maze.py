@@ -1,21 +1,37 @@
+import heapq
+import itertools
+import random
+import re
+import struct
 import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+from collections import deque
+
 
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = 0 if parent is None else parent.cost + 1
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Counts how many nodes in the frontier hold each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,10 +40,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -35,58 +58,89 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
             return node
 
-class Maze():
 
-    def __init__(self, filename):
+class PriorityFrontier():
+    """
+    Frontier that always removes the node with the lowest priority(node),
+    breaking ties in insertion order.
+
+    Adding a state that is already queued replaces it; the older entry
+    is skipped when it reaches the top of the heap.
+    """
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.frontier = []
+        self.counter = itertools.count()
+
+        # Cost of the live node queued for each state
+        self.costs = {}
+
+    def add(self, node):
+        self.costs[node.state] = node.cost
+        heapq.heappush(
+            self.frontier, (self.priority(node), next(self.counter), node)
+        )
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+    def contains_state(self, state):
+        return state in self.costs
+
+    def empty(self):
+        self.discard_replaced()
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            del self.costs[node.state]
+            return node
 
-        # Validate start and goal
-        if contents.count("A") != 1:
-            raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
-            raise Exception("maze must have exactly one goal")
+    def discard_replaced(self):
+        while self.frontier:
+            node = self.frontier[0][2]
+            if self.costs.get(node.state) == node.cost:
+                return
+            heapq.heappop(self.frontier)
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
 
-        # Keep track of walls
+STRATEGIES = ("dfs", "bfs", "greedy", "astar")
+
+
+class Maze():
+
+    def __init__(self, filename):
+
+        # Read file one line at a time, keeping track of walls
         self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        self.height, self.width, self.start, self.goal = read_maze(
+            filename, self.add_row
+        )
+
+        # Rows shorter than the widest one are open on the right
+        for row in self.walls:
+            row.extend([False] * (self.width - len(row)))
 
         self.solution = None
 
+    def add_row(self, i, line):
+        """Stores the walls of row i, given as a line of the maze file."""
+        self.walls.append([c not in " AB" for c in line])
+
+    def is_wall(self, i, j):
+        return self.walls[i][j]
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = set(self.solution[1]) if self.solution is not None else None
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
+        for i in range(self.height):
+            for j in range(self.width):
+                if self.is_wall(i, j):
                     print("█", end="")
                 elif (i, j) == self.start:
                     print("A", end="")
@@ -116,15 +170,40 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
-
-        # Keep track of number of states explored
+    def heuristic(self, state):
+        """Returns the Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+    def frontier(self, strategy):
+        """Returns an empty frontier for a search strategy."""
+        if strategy == "dfs":
+            return StackFrontier()
+        elif strategy == "bfs":
+            return QueueFrontier()
+        elif strategy == "greedy":
+            return PriorityFrontier(lambda node: self.heuristic(node.state))
+        elif strategy == "astar":
+            return PriorityFrontier(
+                lambda node: node.cost + self.heuristic(node.state)
+            )
+        raise ValueError(f"unknown strategy {strategy!r}")
+
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists.
+
+        `strategy` is one of STRATEGIES: depth-first, breadth-first,
+        greedy best-first or A* search, the last two guided by the
+        Manhattan distance to the goal. BFS and A* find shortest paths.
+        """
+
+        # Keep track of number of states explored and time taken
         self.num_explored = 0
+        started = time.perf_counter()
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        frontier = self.frontier(strategy)
         frontier.add(start)
 
         # Initialize an empty explored set
@@ -135,6 +214,7 @@ class Maze():
 
             # If nothing left in frontier, then no path
             if frontier.empty():
+                self.solve_time = time.perf_counter() - started
                 raise Exception("no solution")
 
             # Choose a node from the frontier
@@ -152,78 +232,489 @@ class Maze():
                 actions.reverse()
                 cells.reverse()
                 self.solution = (actions, cells)
+                self.solve_time = time.perf_counter() - started
                 return
 
             # Mark node as explored
             self.explored.add(node.state)
 
-            # Add neighbors to frontier
+            # Add neighbors to frontier; a priority frontier also takes
+            # a queued state again if this path to it is cheaper
             for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+                if state in self.explored:
+                    continue
+                if frontier.contains_state(state) and not (
+                    isinstance(frontier, PriorityFrontier)
+                    and node.cost + 1 < frontier.costs[state]
+                ):
+                    continue
+                child = Node(state=state, parent=node, action=action)
+                frontier.add(child)
+
+
+    def wall_mask(self, i0, i1):
+        """Returns a NumPy bool array of the walls in rows i0 to i1."""
+        import numpy as np
+        return np.array(self.walls[i0:i1], dtype=bool).reshape(-1, self.width)
+
+    def explored_mask(self):
+        """Returns a NumPy bool array marking every explored cell."""
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        if self.explored:
+            cells = np.array(list(self.explored))
+            mask[cells[:, 0], cells[:, 1]] = True
+        return mask
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, tile_cells=None):
+        """
+        Writes the maze to a PNG file, `cell_size` pixels per cell.
+
+        Cells are colored with NumPy a band of rows at a time and each band
+        is compressed straight into the file, so memory stays bounded no
+        matter how large the maze is. With `tile_cells`, the image is split
+        into tiles of that many cells square, written as
+        <name>_<row>_<col>.png next to filename.
+        """
+        import numpy as np
+
+        # Borders scale with the cells, 2 pixels at the default size
+        cell_border = cell_size // 25
+        colors = np.array([
+            (237, 240, 252),    # Empty cell
+            (40, 40, 40),       # Walls
+            (255, 0, 0),        # Start
+            (0, 171, 28),       # Goal
+            (220, 235, 113),    # Solution
+            (212, 97, 85),      # Explored
+        ], dtype=np.uint8)
+
+        solution = None
+        if self.solution is not None and show_solution and self.solution[1]:
+            solution = np.zeros((self.height, self.width), dtype=bool)
+            cells = np.array(self.solution[1])
+            solution[cells[:, 0], cells[:, 1]] = True
+        explored = None
+        if self.solution is not None and show_explored:
+            explored = self.explored_mask()
+
+        def cell_kinds(i0, i1, j0, j1):
+            # Later assignments win, matching the priority of the old
+            # per-cell if/elif chain
+            kinds = np.zeros((i1 - i0, j1 - j0), dtype=np.uint8)
+            if explored is not None:
+                kinds[explored[i0:i1, j0:j1]] = 5
+            if solution is not None:
+                kinds[solution[i0:i1, j0:j1]] = 4
+            for kind, (i, j) in ((2, self.start), (3, self.goal)):
+                if i0 <= i < i1 and j0 <= j < j1:
+                    kinds[i - i0, j - j0] = kind
+            kinds[self.wall_mask(i0, i1)[:, j0:j1]] = 1
+            return kinds
+
+        # Pixels of each cell that belong to its border rather than its fill
+        offsets = np.arange(cell_size)
+        fill = (offsets >= cell_border) & (offsets <= cell_size - cell_border)
+        border = ~(fill[:, None] & fill[None, :])
+
+        def band_pixels(i0, i1, j0, j1):
+            pixels = colors[cell_kinds(i0, i1, j0, j1)]
+            pixels = pixels.repeat(cell_size, axis=0).repeat(cell_size, axis=1)
+            pixels[np.tile(border, (i1 - i0, j1 - j0))] = 0
+            return pixels
+
+        if tile_cells is None:
+            write_png(filename, self.height, self.width, cell_size,
+                      lambda i0, i1: band_pixels(i0, i1, 0, self.width))
+            return
+
+        stem = filename[:-4] if filename.endswith(".png") else filename
+        for ti, i0 in enumerate(range(0, self.height, tile_cells)):
+            for tj, j0 in enumerate(range(0, self.width, tile_cells)):
+                i1 = min(i0 + tile_cells, self.height)
+                j1 = min(j0 + tile_cells, self.width)
+                write_png(f"{stem}_{ti}_{tj}.png", i1 - i0, j1 - j0,
+                          cell_size,
+                          lambda a, b, i0=i0, j0=j0, j1=j1:
+                          band_pixels(i0 + a, i0 + b, j0, j1))
+
+
+# Upper bound on the pixels rendered at once by write_png
+BAND_PIXELS = 1 << 22
+
+
+def write_png(filename, rows, cols, cell_size, band_pixels):
+    """
+    Writes a rows x cols cell image to filename as an RGB PNG.
+
+    band_pixels(i0, i1) must return the pixels of cell rows i0 to i1 as
+    a NumPy uint8 array; it is called for bands of rows small enough to
+    keep each band under BAND_PIXELS pixels.
+    """
+    import numpy as np
+
+    def chunk(kind, data):
+        body = kind + data
+        return (len(data).to_bytes(4, "big") + body
+                + zlib.crc32(body).to_bytes(4, "big"))
+
+    height = rows * cell_size
+    width = cols * cell_size
+    band = max(1, BAND_PIXELS // (width * cell_size))
+    compressor = zlib.compressobj(6)
+    with open(filename, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height,
+                                            8, 2, 0, 0, 0)))
+        for i0 in range(0, rows, band):
+            pixels = band_pixels(i0, min(i0 + band, rows))
+
+            # Every scanline starts with filter type 0 (none)
+            lines = np.zeros((pixels.shape[0], 1 + width * 3), dtype=np.uint8)
+            lines[:, 1:] = pixels.reshape(pixels.shape[0], -1)
+            data = compressor.compress(lines.tobytes())
+            if data:
+                f.write(chunk(b"IDAT", data))
+        f.write(chunk(b"IDAT", compressor.flush()))
+        f.write(chunk(b"IEND", b""))
+
+
+def read_maze(filename, add_row):
+    """
+    Streams a maze file one line at a time, calling add_row(i, line)
+    for each row, and returns (height, width, start, goal).
+
+    Raises an exception unless there is exactly one start and one goal.
+    """
+    height = width = 0
+    starts = goals = 0
+    start = goal = None
+    with open(filename) as f:
+        for i, line in enumerate(f):
+            line = line.rstrip("\r\n")
+            if "A" in line:
+                starts += line.count("A")
+                start = (i, line.index("A"))
+            if "B" in line:
+                goals += line.count("B")
+                goal = (i, line.index("B"))
+            add_row(i, line)
+            height = i + 1
+            width = max(width, len(line))
+
+    # Validate start and goal
+    if starts != 1:
+        raise Exception("maze must have exactly one start point")
+    if goals != 1:
+        raise Exception("maze must have exactly one goal")
+    return height, width, start, goal
+
+
+class CompactMaze(Maze):
+    """
+    Maze for very large grids.
+
+    Walls are packed one bit per cell, each row padded to whole bytes.
+    solve works on flat cell indices i * width + j, keeping visited
+    flags in a bytearray and parents in an array of ints instead of
+    Node objects and a set of tuples.
+    """
+
+    # Open cells become "0" bits; anything else left over is a wall
+    OPEN_BITS = str.maketrans({" ": "0", "A": "0", "B": "0"})
+    NOT_OPEN = re.compile("[^0]")
 
+    def __init__(self, filename):
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
+        # Pack each row as it is read; rows are padded to the final
+        # stride once the widest row is known
+        rows = []
+        self.height, self.width, self.start, self.goal = read_maze(
+            filename, lambda i, line: rows.append(self.pack_row(line))
+        )
+        self.stride = (self.width + 7) // 8
+        self.walls = bytearray(
+            b"".join(row.ljust(self.stride, b"\0") for row in rows)
         )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+        self.solution = None
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+    def pack_row(self, line):
+        """Returns the walls of a line of the maze file as packed bits."""
+        bits = self.NOT_OPEN.sub("1", line.translate(self.OPEN_BITS))
+        if not bits:
+            return b""
+        return int(bits[::-1], 2).to_bytes((len(bits) + 7) // 8, "little")
+
+    def is_wall(self, i, j):
+        return self.walls[i * self.stride + (j >> 3)] >> (j & 7) & 1 == 1
+
+    def wall_mask(self, i0, i1):
+        import numpy as np
+        rows = np.frombuffer(
+            self.walls, dtype=np.uint8,
+            count=(i1 - i0) * self.stride, offset=i0 * self.stride
+        ).reshape(i1 - i0, self.stride)
+        bits = np.unpackbits(rows, axis=1, bitorder="little")
+        return bits[:, :self.width].astype(bool)
+
+    def explored_mask(self):
+        import numpy as np
+        flags = np.frombuffer(self.explored.flags, dtype=np.uint8)
+        return flags.reshape(self.height, self.width) != 0
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+    def neighbors(self, state):
+        row, col = state
+        result = []
+        for action, (r, c) in (("up", (row - 1, col)),
+                               ("down", (row + 1, col)),
+                               ("left", (row, col - 1)),
+                               ("right", (row, col + 1))):
+            if (0 <= r < self.height and 0 <= c < self.width
+                    and not self.is_wall(r, c)):
+                result.append((action, (r, c)))
+        return result
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+    def solve(self, strategy="dfs"):
+        """
+        Finds a solution to maze, if one exists, with the same strategies
+        as Maze.solve but on flat arrays.
 
-                # Empty cell
+        Cells are marked visited when first added to the frontier, so each
+        cell is queued at most once except when A* finds a cheaper path.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}")
+        self.num_explored = 0
+        started = time.perf_counter()
+
+        width = self.width
+        size = self.height * width
+        walls = self.walls
+        stride = self.stride
+        start = self.start[0] * width + self.start[1]
+        goal = self.goal[0] * width + self.goal[1]
+        goal_i, goal_j = self.goal
+
+        # parents[k] is the cell that cell k was reached from, -1 if none;
+        # visited[k] is 1 once k is queued and 2 once it is explored
+        parents = array("i", [-1]) * size
+        visited = bytearray(size)
+        costs = array("i", [0]) * size if strategy == "astar" else None
+
+        def priority(k):
+            i, j = divmod(k, width)
+            distance = abs(i - goal_i) + abs(j - goal_j)
+            return distance + costs[k] if strategy == "astar" else distance
+
+        if strategy in ("dfs", "bfs"):
+            frontier = deque([start])
+            remove = frontier.pop if strategy == "dfs" else frontier.popleft
+        else:
+            frontier = [(priority(start), start)]
+        visited[start] = 1
+
+        found = False
+        while frontier:
+            if strategy in ("dfs", "bfs"):
+                k = remove()
+            else:
+                _, k = heapq.heappop(frontier)
+                if visited[k] == 2:
+                    continue
+            visited[k] = 2
+            self.num_explored += 1
+            if k == goal:
+                found = True
+                break
+
+            i, j = divmod(k, width)
+            for n, ni, nj in ((k - width, i - 1, j), (k + width, i + 1, j),
+                              (k - 1, i, j - 1), (k + 1, i, j + 1)):
+                if not (0 <= ni < self.height and 0 <= nj < width):
+                    continue
+                if walls[ni * stride + (nj >> 3)] >> (nj & 7) & 1:
+                    continue
+                if strategy == "astar":
+                    cost = costs[k] + 1
+                    if visited[n] == 2 or (visited[n] and cost >= costs[n]):
+                        continue
+                    costs[n] = cost
+                elif visited[n]:
+                    continue
+                visited[n] = 1
+                parents[n] = k
+                if strategy in ("dfs", "bfs"):
+                    frontier.append(n)
                 else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+                    heapq.heappush(frontier, (priority(n), n))
+
+        self.explored = FlatCells(visited, width)
+        self.solve_time = time.perf_counter() - started
+        if not found:
+            raise Exception("no solution")
+        self.solution = self.rebuild_path(parents, start, goal)
+
+    def rebuild_path(self, parents, start, goal):
+        """
+        Returns (actions, cells) for the path to goal recorded in the
+        flat parents array.
+        """
+        actions = []
+        cells = []
+        k = goal
+        while k != start:
+            parent = parents[k]
+            if parent == k - self.width:
+                actions.append("down")
+            elif parent == k + self.width:
+                actions.append("up")
+            elif parent == k - 1:
+                actions.append("right")
+            else:
+                actions.append("left")
+            cells.append(divmod(k, self.width))
+            k = parent
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+class FlatCells():
+    """
+    Read-only set of (i, j) cells over a flat visited array, where any
+    non-zero entry marks a cell as present.
+    """
+
+    def __init__(self, flags, width):
+        self.flags = flags
+        self.width = width
+
+    def __contains__(self, cell):
+        i, j = cell
+        return bool(self.flags[i * self.width + j])
+
+    def __len__(self):
+        return len(self.flags) - self.flags.count(0)
+
+
+def generate(height, width, filename, loops=0.05, seed=None):
+    """
+    Writes a random height x width maze to filename.
+
+    Carves a perfect maze with an iterative depth-first backtracker,
+    then knocks out a `loops` fraction of the remaining inner walls so
+    that there is more than one route and the strategies differ.
+    """
+    rng = random.Random(seed)
+    height -= 1 - height % 2
+    width -= 1 - width % 2
+    grid = [bytearray(b"#" * width) for _ in range(height)]
+
+    stack = [(1, 1)]
+    grid[1][1] = ord(" ")
+    while stack:
+        i, j = stack[-1]
+        options = [(i + di, j + dj, i + di // 2, j + dj // 2)
+                   for di, dj in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 0 < i + di < height - 1 and 0 < j + dj < width - 1
+                   and grid[i + di][j + dj] == ord("#")]
+        if not options:
+            stack.pop()
+            continue
+        ni, nj, wi, wj = rng.choice(options)
+        grid[wi][wj] = ord(" ")
+        grid[ni][nj] = ord(" ")
+        stack.append((ni, nj))
+
+    for _ in range(int(loops * height * width / 4)):
+        i = rng.randrange(1, height - 1)
+        j = rng.randrange(1, width - 1)
+        if (i + j) % 2 == 1:
+            grid[i][j] = ord(" ")
+
+    grid[1][1] = ord("A")
+    grid[height - 2 - (height - 3) % 2][width - 2 - (width - 3) % 2] = ord("B")
+    with open(filename, "wb") as f:
+        for row in grid:
+            f.write(bytes(row) + b"\n")
+
+
+def compare_strategies(maze):
+    """
+    Solves the maze with every strategy and prints the number of
+    states explored, path length and time taken by each.
+    """
+    print(f"{'strategy':<10}{'explored':>12}{'length':>10}{'seconds':>10}")
+    for strategy in STRATEGIES:
+        maze.solve(strategy)
+        print(f"{strategy:<10}{maze.num_explored:>12}"
+              f"{len(maze.solution[0]):>10}{maze.solve_time:>10.3f}")
+
+
+def compare_storage(filename, strategy):
+    """
+    Loads and solves the maze as a Maze and as a CompactMaze and prints
+    the time taken and the traced memory of each step.
+
+    Times are taken with tracemalloc running, which slows both down;
+    'maze.py maze.txt all [compact]' gives untraced solve times.
+    """
+    print(f"{'maze':<12}{'load s':>8}{'load MiB':>10}"
+          f"{'solve s':>9}{'peak MiB':>10}")
+    for maze_class in (Maze, CompactMaze):
+        tracemalloc.start()
+        started = time.perf_counter()
+        maze = maze_class(filename)
+        load_time = time.perf_counter() - started
+        load_memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        maze.solve(strategy)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{maze_class.__name__:<12}{load_time:>8.2f}"
+              f"{load_memory / 2 ** 20:>10.1f}{maze.solve_time:>9.2f}"
+              f"{peak / 2 ** 20:>10.1f}")
+
+
+USAGE = """Usage: python maze.py maze.txt [strategy|all] [compact]
+       python maze.py generate height width maze.txt
+       python maze.py memory maze.txt [strategy]"""
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "generate":
+        generate(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4])
+        return
+    if len(sys.argv) in (3, 4) and sys.argv[1] == "memory":
+        strategy = sys.argv[3] if len(sys.argv) == 4 else "bfs"
+        if strategy not in STRATEGIES:
+            sys.exit(USAGE)
+        compare_storage(sys.argv[2], strategy)
+        return
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit(USAGE)
+    strategy = sys.argv[2] if len(sys.argv) >= 3 else "dfs"
+    if strategy not in STRATEGIES + ("all",):
+        sys.exit(USAGE)
+    if len(sys.argv) == 4 and sys.argv[3] != "compact":
+        sys.exit(USAGE)
+
+    m = CompactMaze(sys.argv[1]) if len(sys.argv) == 4 else Maze(sys.argv[1])
+    if strategy == "all":
+        compare_strategies(m)
+        return
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(strategy)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from logic import *
+
+# Imported up front so that loading them is not timed
+import sat
+import truthtable
+from knowledge import KnowledgeBase
+
+USAGE = """Usage: python benchmark.py [max_characters]
+       python benchmark.py evaluate [characters]
+       python benchmark.py truthtable [max_symbols]
+       python benchmark.py build [clauses]
+       python benchmark.py queries [max_characters]
+       python benchmark.py incremental [characters]"""
+
+# Most symbols each method is timed on; enumerating more is too slow
+SYMBOL_LIMITS = {"recursive": 12, "enumerate": 16, "numpy": 24, "sat": None}
+
+# Most symbols each method gets for a single query in the throughput report
+THROUGHPUT_LIMITS = {"recursive": 16, "enumerate": 20, "numpy": 28}
+
+
+def main():
+    commands = ("evaluate", "truthtable", "build", "queries", "incremental")
+    if len(sys.argv) > 3 or len(sys.argv) == 3 and sys.argv[1] not in commands:
+        sys.exit(USAGE)
+    if len(sys.argv) >= 2 and sys.argv[1] == "evaluate":
+        characters = int(sys.argv[2]) if len(sys.argv) == 3 else 10
+        compare_evaluation(characters)
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == "truthtable":
+        max_symbols = int(sys.argv[2]) if len(sys.argv) == 3 else 28
+        compare_throughput(max_symbols)
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == "queries":
+        max_characters = int(sys.argv[2]) if len(sys.argv) == 3 else 10
+        compare_queries(max_characters)
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == "incremental":
+        characters = int(sys.argv[2]) if len(sys.argv) == 3 else 50
+        compare_incremental(characters)
+        return
+    if len(sys.argv) >= 2 and sys.argv[1] == "build":
+        clauses = int(sys.argv[2]) if len(sys.argv) == 3 else 100000
+        benchmark_build(clauses)
+        return
+    max_characters = int(sys.argv[1]) if len(sys.argv) == 2 else 200
+    compare_methods(max_characters)
+
+
+def compare_methods(max_characters):
+    """
+    Asks every model checking method which symbols generated puzzles
+    entail, and prints the seconds each takes per puzzle.
+
+    Exits if two methods disagree.
+    """
+    sizes = [n for n in (2, 4, 6, 8, 10, 25, 50, 100, 200, 500)
+             if n <= max_characters]
+    print(f"{'characters':>10}{'symbols':>9}{'entailed':>10}"
+          + "".join(f"{method + ' s':>13}" for method in SYMBOL_LIMITS))
+    for characters in sizes:
+        knowledge, symbols = generate_puzzle(characters)
+        answers = {}
+        row = ""
+        for method, limit in SYMBOL_LIMITS.items():
+            if limit is not None and len(symbols) > limit:
+                row += f"{'-':>13}"
+                continue
+            start = time.perf_counter()
+            found = [model_check(knowledge, symbol, method=method)
+                     for symbol in symbols]
+            row += f"{time.perf_counter() - start:>13.3f}"
+            if answers.setdefault("found", found) != found:
+                sys.exit(f"methods disagree on {characters} characters")
+        print(f"{characters:>10}{len(symbols):>9}"
+              f"{sum(answers['found']):>10}{row}")
+
+
+def compare_evaluation(characters, models=20000):
+    """
+    Prints how many random models per second a generated puzzle's
+    knowledge base is evaluated in by walking the sentence objects and
+    by its compiled function.
+    """
+    knowledge, _ = generate_puzzle(characters)
+    symbols = sorted(knowledge.symbols())
+    rng = random.Random(0)
+    samples = [[rng.random() < 0.5 for _ in symbols] for _ in range(models)]
+    dicts = [dict(zip(symbols, sample)) for sample in samples]
+
+    start = time.perf_counter()
+    compiled = compile_sentence(knowledge, symbols)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    walked = [knowledge.evaluate(model) for model in dicts]
+    walk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [compiled(sample) for sample in samples]
+    fast_time = time.perf_counter() - start
+
+    if walked != fast:
+        sys.exit("compiled sentence disagrees with evaluate")
+    print(f"{len(symbols)} symbols, compiled in {1000 * compile_time:.1f}ms")
+    print(f"{'evaluator':<12}{'models/s':>12}")
+    print(f"{'evaluate':<12}{models / walk_time:>12.0f}")
+    print(f"{'compiled':<12}{models / fast_time:>12.0f}")
+    print(f"Speedup: {walk_time / fast_time:.1f}x")
+
+
+def compare_throughput(max_symbols):
+    """
+    Prints how many models per second each enumerating method checks on
+    a query that generated puzzles entail, so that every model has to be
+    checked, and how much faster the NumPy bit vectors are than the
+    recursive checker.
+    """
+    print(f"{'symbols':>8}"
+          + "".join(f"{method + ' models/s':>22}" for method in THROUGHPUT_LIMITS)
+          + f"{'speedup':>10}")
+    for symbols in range(12, max_symbols + 1, 4):
+        knowledge, names = generate_puzzle(symbols // 2)
+        query = names[0]
+        if not model_check(knowledge, query, method="sat"):
+            query = Not(query)
+        rates = {}
+        row = ""
+        for method, limit in THROUGHPUT_LIMITS.items():
+            if symbols > limit:
+                row += f"{'-':>22}"
+                continue
+            start = time.perf_counter()
+            if not model_check(knowledge, query, method=method):
+                sys.exit(f"{method} misses an entailment")
+            rates[method] = 2 ** symbols / (time.perf_counter() - start)
+            row += f"{rates[method]:>22.0f}"
+        speedup = (f"{rates['numpy'] / rates['recursive']:>9.0f}x"
+                   if "recursive" in rates else f"{'-':>10}")
+        print(f"{symbols:>8}{row}{speedup}")
+
+
+def compare_queries(max_characters):
+    """
+    Prints the seconds taken to answer every symbol of generated puzzles
+    with one model_check per symbol and with a single entailments call,
+    enumerating in this process, over a process pool, and with the SAT
+    solver.
+
+    Exits if the answers differ.
+    """
+    workers = os.cpu_count()
+    runs = (
+        ("per query", lambda k, symbols: [
+            ENTAILED if model_check(k, symbol) else
+            CONTRADICTED if model_check(k, Not(symbol)) else UNKNOWN
+            for symbol in symbols
+        ]),
+        ("one pass", lambda k, symbols: entailments(k, symbols)),
+        (f"{workers} workers",
+         lambda k, symbols: entailments(k, symbols, workers=workers)),
+        ("sat", lambda k, symbols: entailments(k, symbols, method="sat")),
+    )
+    print(f"{'characters':>10}{'symbols':>9}"
+          + "".join(f"{name + ' s':>16}" for name, _ in runs))
+    for characters in range(4, max_characters + 1, 2):
+        knowledge, symbols = generate_puzzle(characters)
+        answers = {}
+        row = ""
+        for name, run in runs:
+            start = time.perf_counter()
+            found = run(knowledge, symbols)
+            row += f"{time.perf_counter() - start:>16.3f}"
+            if answers.setdefault("found", found) != found:
+                sys.exit(f"{name} disagrees on {characters} characters")
+        print(f"{characters:>10}{len(symbols):>9}{row}")
+
+
+def compare_incremental(characters):
+    """
+    Adds the sentences of a generated puzzle one at a time and asks about
+    every symbol after each, once re-encoding everything for the SAT
+    solver at every step and once with a KnowledgeBase that keeps its
+    solver. Prints the total seconds of each and the solver conflicts the
+    KnowledgeBase needed.
+
+    Exits if the answers differ.
+    """
+    knowledge, symbols = generate_puzzle(characters)
+    sentences = knowledge.conjuncts
+
+    start = time.perf_counter()
+    rebuilt = [entailments(And(*sentences[:i + 1]), symbols, method="sat")
+               for i in range(len(sentences))]
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kb = KnowledgeBase()
+    kept = []
+    for sentence in sentences:
+        kb.add(sentence)
+        kept.append([kb.ask(symbol) for symbol in symbols])
+    incremental_time = time.perf_counter() - start
+
+    if rebuilt != kept:
+        sys.exit("KnowledgeBase disagrees with re-solving")
+    queries = len(sentences) * len(symbols)
+    print(f"{len(sentences)} sentences added one at a time, "
+          f"{queries} queries")
+    print(f"{'solver':<16}{'s':>10}{'ms/query':>10}")
+    print(f"{'rebuilt':<16}{rebuild_time:>10.3f}"
+          f"{1000 * rebuild_time / queries:>10.3f}")
+    print(f"{'incremental':<16}{incremental_time:>10.3f}"
+          f"{1000 * incremental_time / queries:>10.3f}")
+    print(f"KnowledgeBase solver: {kb.solver.conflicts} conflicts, "
+          f"{len(kb.solver.learned)} learned clauses")
+
+
+def benchmark_build(clauses, symbols=1000):
+    """
+    Builds a knowledge base of `clauses` random three-literal clauses
+    over `symbols` symbols and prints the time and memory it takes, then
+    the time of two rounds of hash, symbols and formula on it.
+    """
+    rng = random.Random(0)
+    names = [f"P{i}" for i in range(symbols)]
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    knowledge = And()
+    for _ in range(clauses):
+        literals = []
+        for name in rng.sample(names, 3):
+            literal = Symbol(name)
+            literals.append(Not(literal) if rng.random() < 0.5 else literal)
+        knowledge.add(Or(*literals))
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Built {clauses} clauses in {elapsed:.2f}s, "
+          f"{size / 2 ** 20:.1f} MiB")
+
+    print(f"{'operation':<12}{'first s':>10}{'again s':>10}")
+    for name, operation in (("hash", hash),
+                            ("symbols", lambda s: s.symbols()),
+                            ("formula", lambda s: s.formula())):
+        times = []
+        for _ in range(2):
+            start = time.perf_counter()
+            operation(knowledge)
+            times.append(time.perf_counter() - start)
+        print(f"{name:<12}{times[0]:>10.3f}{times[1]:>10.3f}")
+
+
+def generate_puzzle(characters, statements=2, seed=0):
+    """
+    Returns a random knights and knaves puzzle with the given number of
+    characters, each making `statements` statements about the others,
+    as a knowledge base and the list of its symbols.
+
+    Every character is secretly a knight or a knave and every statement
+    is true exactly when its speaker is a knight, so the knowledge base
+    always has a model.
+    """
+    rng = random.Random(seed)
+    names = [f"C{i}" for i in range(characters)]
+    knight = {name: Symbol(f"{name} is a Knight") for name in names}
+    knave = {name: Symbol(f"{name} is a Knave") for name in names}
+    truth = {}
+    for name in names:
+        is_knight = rng.random() < 0.5
+        truth[knight[name].name] = is_knight
+        truth[knave[name].name] = not is_knight
+
+    knowledge = And()
+    for name in names:
+        knowledge.add(Biconditional(knight[name], Not(knave[name])))
+    for name in names:
+        others = [other for other in names if other != name] or [name]
+        for _ in range(statements):
+            b, c = rng.choice(others), rng.choice(others)
+            statement = rng.choice((
+                knight[b],
+                knave[b],
+                Biconditional(knight[b], knight[c]),
+                Or(knave[b], knave[c]),
+                Implication(knight[b], knave[c]),
+            ))
+            if statement.evaluate(truth) != truth[knight[name].name]:
+                statement = Not(statement)
+            knowledge.add(Biconditional(knight[name], statement))
+
+    symbols = []
+    for name in names:
+        symbols.extend((knight[name], knave[name]))
+    return knowledge, symbols
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Incremental knowledge base
+
+A KnowledgeBase keeps its clauses and SAT solver between calls, so facts
+can be added one at a time and every query reuses what the solver has
+learned so far instead of starting over.
+
+push() opens a scope and pop() drops every sentence added since. Each
+scope has a selector variable: sentences added inside it are encoded as
+"selector implies sentence", and queries assume the selectors of the
+open scopes. Popping a scope asserts its selector false for good, which
+switches its clauses off while keeping learned clauses valid, since any
+clause learned from them mentions the selector.
+
+Models the solver finds are kept until the next add, which is the only
+call that can rule them out; a query that a kept model already makes
+false (or true) skips that solver call.
+"""
+
+from logic import CONTRADICTED, ENTAILED, UNKNOWN, And, Sentence
+from sat import Encoder
+
+# Most models kept for answering queries without the solver
+MODELS_KEPT = 64
+
+
+class KnowledgeBase():
+
+    def __init__(self, *sentences):
+        self.encoder = Encoder()
+        self.solver = self.encoder.solver
+        self.sentences = []
+
+        # Selector variable of each open scope and how many sentences
+        # there were when it was opened
+        self.scopes = []
+
+        # Variable values of models found since the last add
+        self.models = []
+
+        for sentence in sentences:
+            self.add(sentence)
+
+    def __repr__(self):
+        return f"KnowledgeBase({', '.join(map(str, self.sentences))})"
+
+    def add(self, sentence):
+        """Adds a sentence to the knowledge base, in the innermost scope."""
+        Sentence.validate(sentence)
+        guard = self.scopes[-1][0] if self.scopes else None
+        self.encoder.add(sentence, guard)
+        self.sentences.append(sentence)
+        self.models = []
+
+    def push(self):
+        """Opens a scope; pop removes everything added after this."""
+        self.scopes.append((self.solver.new_var(), len(self.sentences)))
+
+    def pop(self):
+        """Removes every sentence added since the matching push."""
+        if not self.scopes:
+            raise Exception("no scope to pop")
+        selector, size = self.scopes.pop()
+        self.solver.add_clause([-selector])
+        del self.sentences[size:]
+
+    def solve(self, literals):
+        """
+        Returns True if the knowledge base has a model where literals are
+        all true, keeping the model.
+        """
+        assumptions = [selector for selector, _ in self.scopes]
+        if not self.solver.solve(assumptions + literals):
+            return False
+        self.models.append(self.solver.model)
+        del self.models[:-MODELS_KEPT]
+        return True
+
+    def seen(self, literal, value):
+        """Returns True if a kept model gives literal the value."""
+        v = abs(literal)
+        for model in self.models:
+            if v < len(model) and (model[v] == (literal > 0)) == value:
+                return True
+        return False
+
+    def satisfiable(self):
+        """Returns True if the knowledge base has a model."""
+        return bool(self.models) or self.solve([])
+
+    def model(self):
+        """
+        Returns a model of the knowledge base as symbol values by name,
+        or None if it has none.
+        """
+        if not self.satisfiable():
+            return None
+        model = self.models[-1]
+        return {name: model[v] for name, v in self.encoder.variables.items()
+                if v < len(model)}
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        literal = self.encoder.literal(query)
+        return not (self.seen(literal, False) or self.solve([-literal]))
+
+    def ask(self, query):
+        """
+        Returns ENTAILED if the knowledge base entails query, CONTRADICTED
+        if it entails its negation and UNKNOWN otherwise.
+        """
+        literal = self.encoder.literal(query)
+        if not (self.seen(literal, False) or self.solve([-literal])):
+            return ENTAILED
+        if not (self.seen(literal, True) or self.solve([literal])):
+            return CONTRADICTED
+        return UNKNOWN
+
+    def sentence(self):
+        """Returns the knowledge base as one And, for model_check."""
+        return And(*self.sentences)
@@ -1,8 +1,29 @@
 import itertools
+import weakref
+
+
+# Answers of entailments for each query
+ENTAILED = "entailed"
+CONTRADICTED = "contradicted"
+UNKNOWN = "unknown"
+
+# Compiled knowledge base and queries of a worker process in entailments
+worker_state = None
+
+# Every live frozen sentence (one with no And inside, see Sentence.frozen)
+# by its class and the ids of its parts (the name, for symbols), so that
+# building a sentence equal to a live one returns that object instead of
+# a copy
+interned = weakref.WeakValueDictionary()
 
 
 class Sentence():
 
+    # Hash, symbol set and formula, each computed on first use and kept
+    # only by frozen sentences; frozen is False when the sentence contains
+    # an And, which add can still change
+    __slots__ = ("_hash", "_symbols", "_formula", "frozen", "__weakref__")
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -12,9 +33,21 @@ class Sentence():
         return ""
 
     def symbols(self):
-        """Returns a set of all symbols in the logical sentence."""
+        """
+        Returns a set of all symbols in the logical sentence.
+
+        The set is cached and may be shared between sentences, so it must
+        not be modified.
+        """
         return set()
 
+    def code(self, index):
+        """
+        Returns a Python expression computing the sentence from a list m
+        of truth values, where symbol name s is m[index[s]].
+        """
+        raise Exception("nothing to compile")
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -41,21 +74,78 @@ class Sentence():
         else:
             return f"({s})"
 
+    @classmethod
+    def intern(cls, parts):
+        """
+        Returns the live sentence of this class built from parts, or a new,
+        empty one that the caller fills in, along with True if it is new.
+
+        Only sentences whose parts are all frozen are shared; any other
+        gets a new object every time.
+        """
+        frozen = all(part.frozen for part in parts)
+        if frozen:
+            key = (cls, *map(id, parts))
+            sentence = interned.get(key)
+            if sentence is not None:
+                return sentence, False
+        sentence = object.__new__(cls)
+        sentence.frozen = frozen
+        sentence._hash = None
+        sentence._symbols = None
+        sentence._formula = None
+        if frozen:
+            interned[key] = sentence
+        return sentence, True
+
+    def keep(self, slot, value):
+        """
+        Stores value in the cache slot if the sentence is frozen, and
+        returns it.
+        """
+        if self.frozen:
+            setattr(self, slot, value)
+        return value
+
+    def parts(self):
+        """Returns the arguments that build the sentence."""
+        return ()
+
+    def __reduce__(self):
+        return (type(self), self.parts())
+
 
 class Symbol(Sentence):
 
-    def __init__(self, name):
-        self.name = name
+    __slots__ = ("name",)
+
+    def __new__(cls, name):
+        key = (cls, name)
+        symbol = interned.get(key)
+        if symbol is None:
+            symbol = object.__new__(cls)
+            symbol.name = name
+            symbol.frozen = True
+            symbol._hash = hash(("symbol", name))
+            symbol._symbols = None
+            symbol._formula = None
+            interned[key] = symbol
+        return symbol
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
 
+    def parts(self):
+        return (self.name,)
+
     def evaluate(self, model):
         try:
             return bool(model[self.name])
@@ -66,41 +156,82 @@ class Symbol(Sentence):
         return self.name
 
     def symbols(self):
-        return {self.name}
+        if self._symbols is None:
+            self._symbols = {self.name}
+        return self._symbols
+
+    def code(self, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
 
 
 class Not(Sentence):
-    def __init__(self, operand):
+
+    __slots__ = ("operand",)
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        sentence, new = cls.intern((operand,))
+        if new:
+            sentence.operand = operand
+        return sentence
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is not None:
+            return self._hash
+        return self.keep("_hash", hash(("not", hash(self.operand))))
 
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def parts(self):
+        return (self.operand,)
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
     def formula(self):
-        return "¬" + Sentence.parenthesize(self.operand.formula())
+        if self._formula is not None:
+            return self._formula
+        return self.keep(
+            "_formula", "¬" + Sentence.parenthesize(self.operand.formula())
+        )
 
     def symbols(self):
-        return self.operand.symbols()
+        if self._symbols is not None:
+            return self._symbols
+        return self.keep("_symbols", self.operand.symbols())
+
+    def code(self, index):
+        return f"(not {self.operand.code(index)})"
 
 
 class And(Sentence):
+    """
+    Conjunction. Unlike the other sentences an And can grow with add, so
+    it is never frozen: every And(...) call makes a new object, it caches
+    nothing, and neither do the sentences that contain it.
+    """
+
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.frozen = False
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
         return hash(
@@ -113,6 +244,9 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def parts(self):
+        return tuple(self.conjuncts)
+
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
@@ -123,93 +257,172 @@ class And(Sentence):
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
-        return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
-                           for conjunct in self.conjuncts])
+        return " ∧ ".join(
+            [Sentence.parenthesize(conjunct.formula())
+             for conjunct in self.conjuncts]
+        )
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
+
+    def code(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.code(index) for conjunct in self.conjuncts
+        ) + ")"
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+
+    __slots__ = ("disjuncts",)
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        sentence, new = cls.intern(disjuncts)
+        if new:
+            sentence.disjuncts = disjuncts
+        return sentence
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        return self.keep("_hash", hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        ))
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def parts(self):
+        return self.disjuncts
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         if len(self.disjuncts) == 1:
-            return self.disjuncts[0].formula()
-        return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
-                            for disjunct in self.disjuncts])
+            return self.keep("_formula", self.disjuncts[0].formula())
+        return self.keep("_formula", " ∨  ".join(
+            [Sentence.parenthesize(disjunct.formula())
+             for disjunct in self.disjuncts]
+        ))
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        if self._symbols is not None:
+            return self._symbols
+        return self.keep("_symbols", set().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        ))
+
+    def code(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.code(index) for disjunct in self.disjuncts
+        ) + ")"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+
+    __slots__ = ("antecedent", "consequent")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        sentence, new = cls.intern((antecedent, consequent))
+        if new:
+            sentence.antecedent = antecedent
+            sentence.consequent = consequent
+        return sentence
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is not None:
+            return self._hash
+        return self.keep("_hash", hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        ))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def parts(self):
+        return (self.antecedent, self.consequent)
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
-        return f"{antecedent} => {consequent}"
+        return self.keep("_formula", f"{antecedent} => {consequent}")
 
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        if self._symbols is not None:
+            return self._symbols
+        return self.keep("_symbols", set.union(self.antecedent.symbols(),
+                                               self.consequent.symbols()))
+
+    def code(self, index):
+        antecedent = self.antecedent.code(index)
+        consequent = self.consequent.code(index)
+        return f"(not {antecedent} or {consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+
+    __slots__ = ("left", "right")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        sentence, new = cls.intern((left, right))
+        if new:
+            sentence.left = left
+            sentence.right = right
+        return sentence
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is not None:
+            return self._hash
+        return self.keep("_hash", hash(
+            ("biconditional", hash(self.left), hash(self.right))
+        ))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def parts(self):
+        return (self.left, self.right)
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
@@ -217,16 +430,67 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
+        if self._formula is not None:
+            return self._formula
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
-        return f"{left} <=> {right}"
+        return self.keep("_formula", f"{left} <=> {right}")
 
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
-
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+        if self._symbols is not None:
+            return self._symbols
+        return self.keep("_symbols", set.union(self.left.symbols(),
+                                               self.right.symbols()))
+
+    def code(self, index):
+        return f"({self.left.code(index)} == {self.right.code(index)})"
+
+
+def compile_sentence(sentence, symbols):
+    """
+    Returns a function computing sentence from a sequence of truth
+    values, the i-th being the value of the i-th symbol name in symbols.
+
+    The function is one Python expression over list positions, built
+    with compile(), so evaluating it needs no method calls or dict
+    lookups.
+    """
+    index = {name: i for i, name in enumerate(symbols)}
+    try:
+        return eval(compile(f"lambda m: {sentence.code(index)}",
+                            "<sentence>", "eval"))
+    except (RecursionError, SyntaxError):
+
+        # Nested too deeply for the Python compiler
+        return lambda m: sentence.evaluate(dict(zip(symbols, m)))
+
+
+def model_check(knowledge, query, method="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    method "enumerate" tries every model on compiled sentences;
+    "recursive" tries every model by walking the sentence objects;
+    "numpy" tries blocks of models at once as bit vectors (truthtable.py);
+    "sat" asks the CDCL solver in sat.py whether knowledge together with
+    the negated query can be true.
+    """
+    if method == "sat":
+        import sat
+        return sat.entails(knowledge, query)
+    if method == "numpy":
+        import truthtable
+        return truthtable.entails(knowledge, query)
+    if method == "enumerate":
+        symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+        knowledge = compile_sentence(knowledge, symbols)
+        query = compile_sentence(query, symbols)
+        for model in itertools.product((True, False), repeat=len(symbols)):
+            if knowledge(model) and not query(model):
+                return False
+        return True
+    if method != "recursive":
+        raise ValueError(f"unknown model checking method {method}")
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
@@ -261,3 +525,88 @@ def model_check(knowledge, query):
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def entailments(knowledge, queries, method="enumerate", workers=None,
+                fixed=None):
+    """
+    Returns, for each query in order, ENTAILED if knowledge entails it,
+    CONTRADICTED if knowledge entails its negation and UNKNOWN otherwise.
+    If knowledge has no models every query is entailed.
+
+    method "enumerate" goes through the models of knowledge once for all
+    queries, stopping as soon as every query is unknown. With `workers`
+    it splits the models over a pool of that many processes, one
+    assignment of the first `fixed` symbols per task. method "sat" asks
+    the solver in sat.py about each query and its negation, encoding
+    knowledge only once.
+    """
+    if method == "sat":
+        import sat
+        return sat.entailments(knowledge, queries)
+    if method != "enumerate":
+        raise ValueError(f"unknown model checking method {method}")
+
+    symbols = sorted(set.union(knowledge.symbols(),
+                               *[query.symbols() for query in queries]))
+    if workers is None:
+        start_worker(knowledge, queries, symbols)
+        true, false = possible_values(())
+    else:
+        from multiprocessing import Pool
+        if fixed is None:
+            fixed = (4 * workers - 1).bit_length()
+        fixed = min(fixed, len(symbols))
+        prefixes = itertools.product((True, False), repeat=fixed)
+        true = [False] * len(queries)
+        false = [False] * len(queries)
+        with Pool(workers, initializer=start_worker,
+                  initargs=(knowledge, queries, symbols)) as pool:
+            for can_be_true, can_be_false in pool.imap_unordered(
+                    possible_values, prefixes):
+                true = [a or b for a, b in zip(true, can_be_true)]
+                false = [a or b for a, b in zip(false, can_be_false)]
+                if all(true) and all(false):
+                    break
+
+    return [ENTAILED if not can_be_false else
+            CONTRADICTED if not can_be_true else UNKNOWN
+            for can_be_true, can_be_false in zip(true, false)]
+
+
+def start_worker(knowledge, queries, symbols):
+    """
+    Compiles the knowledge base and queries for possible_values, once per
+    process.
+    """
+    global worker_state
+    worker_state = (
+        compile_sentence(knowledge, symbols),
+        [compile_sentence(query, symbols) for query in queries],
+        len(symbols),
+    )
+
+
+def possible_values(prefix):
+    """
+    Returns which queries are true in some model of the knowledge base,
+    and which are false in some, over the models whose first symbols
+    have the values in prefix.
+    """
+    knowledge, queries, count = worker_state
+    true = [False] * len(queries)
+    false = [False] * len(queries)
+    undecided = list(range(len(queries)))
+    for rest in itertools.product((True, False), repeat=count - len(prefix)):
+        model = prefix + rest
+        if not knowledge(model):
+            continue
+        for i in undecided:
+            if queries[i](model):
+                true[i] = True
+            else:
+                false[i] = True
+        undecided = [i for i in undecided if not (true[i] and false[i])]
+        if not undecided:
+            break
+    return true, false
@@ -0,0 +1,473 @@
+"""
+SAT backend for model_check
+
+Sentences are turned into clauses with the Tseitin encoding: every
+connective gets a fresh variable that is made equivalent to it, so the
+clauses grow linearly with the sentence. A knowledge base entails a
+query when the knowledge base together with the negated query has no
+satisfying assignment, which a CDCL solver decides without enumerating
+models.
+
+Literals are nonzero integers: variable v is the literal v, its negation
+-v. The solver keeps its clauses, learned clauses and variable
+activities between calls to solve, and takes assumptions for a single
+call, so a knowledge base can be encoded once and queried many times.
+"""
+
+import heapq
+
+from logic import (CONTRADICTED, ENTAILED, UNKNOWN, And, Biconditional,
+                   Implication, Not, Or, Symbol)
+
+# Conflicts before the first restart; later restarts follow the Luby
+# sequence in multiples of this
+RESTART_BASE = 100
+
+# Factor activities of variables in recent conflicts grow by, relative
+# to older ones
+ACTIVITY_DECAY = 0.95
+
+
+def luby(i):
+    """Returns the i-th element (from 1) of the Luby sequence 1 1 2 1 1 2 4..."""
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if (1 << k) - 1 == i:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
+
+
+class Solver():
+    """
+    Conflict-driven clause learning SAT solver with two watched literals
+    per clause, first-UIP learning, activity-ordered decisions with
+    saved phases, and Luby restarts.
+    """
+
+    def __init__(self):
+        self.num_vars = 0
+        self.clauses = []
+        self.learned = []
+
+        # Clauses watching each literal, by literal
+        self.watches = {}
+
+        # Value of every assigned literal, by literal; a variable's two
+        # literals are assigned together
+        self.assigns = {}
+
+        # Per variable, indexed from 1: decision level, the clause that
+        # implied it (None for decisions), activity and saved phase
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [False]
+
+        # Decision order: (-activity, variable), with stale entries
+        # skipped when popped
+        self.order = []
+        self.increment = 1.0
+
+        # Assigned literals in order, where each decision level starts
+        # in it, and how far propagation has got
+        self.trail = []
+        self.trail_lim = []
+        self.head = 0
+
+        # False once the clauses are unsatisfiable without assumptions
+        self.ok = True
+
+        # Variable values of the last satisfying assignment, indexed
+        # from 1
+        self.model = None
+
+        # Counters, for benchmarking
+        self.decisions = 0
+        self.propagations = 0
+        self.conflicts = 0
+
+    def new_var(self):
+        """Adds a variable and returns it."""
+        self.num_vars += 1
+        v = self.num_vars
+        self.watches[v] = []
+        self.watches[-v] = []
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(False)
+        heapq.heappush(self.order, (0.0, v))
+        return v
+
+    def value(self, lit):
+        """Returns True or False for an assigned literal, else None."""
+        return self.assigns.get(lit)
+
+    def add_clause(self, literals):
+        """
+        Adds the disjunction of literals as a clause and returns False if
+        the clauses have become unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        clause = []
+        for lit in literals:
+            value = self.assigns.get(lit)
+            if value is True or -lit in clause:
+                return True
+            if value is None and lit not in clause:
+                clause.append(lit)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watches[clause[0]].append(clause)
+            self.watches[clause[1]].append(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def decision_level(self):
+        return len(self.trail_lim)
+
+    def assign(self, lit, reason):
+        v = abs(lit)
+        self.assigns[lit] = True
+        self.assigns[-lit] = False
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(lit)
+
+    def cancel_until(self, level):
+        """Undoes every assignment above decision level `level`."""
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            v = abs(lit)
+            del self.assigns[lit]
+            del self.assigns[-lit]
+            self.reason[v] = None
+            self.phase[v] = lit > 0
+            heapq.heappush(self.order, (-self.activity[v], v))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.head = min(self.head, start)
+
+        # Drop the stale entries piling up over many calls to solve
+        if len(self.order) > 4 * self.num_vars:
+            self.order = [(-self.activity[u], u)
+                          for u in range(1, self.num_vars + 1)
+                          if u not in self.assigns]
+            heapq.heapify(self.order)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by a clause with one unassigned
+        literal left, and returns a clause with all literals false if
+        there is one, else None.
+        """
+        assigns = self.assigns
+        watches = self.watches
+        while self.head < len(self.trail):
+            false_lit = -self.trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            watchers = watches[false_lit]
+            watches[false_lit] = kept = []
+            for i, clause in enumerate(watchers):
+
+                # Keep the false literal second
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                if assigns.get(first) is True:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that is not false, if any
+                for k in range(2, len(clause)):
+                    if assigns.get(clause[k]) is not False:
+                        clause[1], clause[k] = clause[k], false_lit
+                        watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if assigns.get(first) is False:
+                        kept.extend(watchers[i + 1:])
+                        self.head = len(self.trail)
+                        return clause
+                    self.assign(first, clause)
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learned from a conflict, asserting
+        literal first, and the level to jump back to.
+        """
+        learned = [None]
+        seen = set()
+        counter = 0
+        lit = None
+        clause = conflict
+        index = len(self.trail) - 1
+        level = self.decision_level()
+        while True:
+            for q in clause if lit is None else clause[1:]:
+                v = abs(q)
+                if v not in seen and self.level[v] > 0:
+                    seen.add(v)
+                    self.bump(v)
+                    if self.level[v] == level:
+                        counter += 1
+                    else:
+                        learned.append(q)
+
+            # Walk back to the latest literal of this conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            lit = self.trail[index]
+            index -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason[abs(lit)]
+        learned[0] = -lit
+
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal of the highest remaining level second
+        highest = max(range(1, len(learned)),
+                      key=lambda k: self.level[abs(learned[k])])
+        learned[1], learned[highest] = learned[highest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def bump(self, v):
+        """Raises the activity of a variable found in a conflict."""
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-self.activity[u], u)
+                          for u in range(1, self.num_vars + 1)
+                          if u not in self.assigns]
+            heapq.heapify(self.order)
+        elif v not in self.assigns:
+            heapq.heappush(self.order, (-self.activity[v], v))
+
+    def pick_branch(self):
+        """Returns the next decision literal, or None if all are assigned."""
+        while self.order:
+            _, v = heapq.heappop(self.order)
+            if v not in self.assigns:
+                return v if self.phase[v] else -v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses and assumption literals can all be
+        true, leaving the assignment in model, else False.
+
+        Assumptions hold for this call only; learned clauses are kept.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+
+        restarts = 1
+        restart_at = self.conflicts + RESTART_BASE * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if self.decision_level() == 0:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watches[learned[0]].append(learned)
+                    self.watches[learned[1]].append(learned)
+                    self.learned.append(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= ACTIVITY_DECAY
+                continue
+
+            if self.conflicts >= restart_at:
+                restarts += 1
+                restart_at = self.conflicts + RESTART_BASE * luby(restarts)
+                self.cancel_until(0)
+                continue
+
+            # Assumptions are the first decisions, one level each
+            lit = None
+            while self.decision_level() < len(assumptions):
+                p = assumptions[self.decision_level()]
+                value = self.assigns.get(p)
+                if value is False:
+                    self.cancel_until(0)
+                    return False
+                self.trail_lim.append(len(self.trail))
+                if value is None:
+                    self.assign(p, None)
+                    lit = p
+                    break
+            if lit is not None:
+                continue
+
+            lit = self.pick_branch()
+            if lit is None:
+                self.model = [None] + [
+                    self.assigns[v] for v in range(1, self.num_vars + 1)
+                ]
+                self.cancel_until(0)
+                return True
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.assign(lit, None)
+
+
+class Encoder():
+    """
+    Tseitin-encodes sentences into the clauses of a Solver, one variable
+    per symbol name and per distinct compound subsentence. Sentences
+    containing an And can still change, so they get a new variable each
+    time they are encoded.
+    """
+
+    def __init__(self, solver=None):
+        self.solver = solver or Solver()
+        self.variables = {}
+        self.literals = {}
+        self.true = None
+
+    def variable(self, name):
+        """Returns the variable of a symbol name."""
+        if name not in self.variables:
+            self.variables[name] = self.solver.new_var()
+        return self.variables[name]
+
+    def constant(self, value):
+        """Returns a literal that is always `value`."""
+        if self.true is None:
+            self.true = self.solver.new_var()
+            self.solver.add_clause([self.true])
+        return self.true if value else -self.true
+
+    def literal(self, sentence):
+        """
+        Returns a literal that is true exactly when sentence is, adding
+        the clauses that define it.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if sentence.frozen and sentence in self.literals:
+            return self.literals[sentence]
+
+        add = self.solver.add_clause
+        if isinstance(sentence, And):
+            if not sentence.conjuncts:
+                return self.constant(True)
+            parts = [self.literal(c) for c in sentence.conjuncts]
+            x = self.solver.new_var()
+            for p in parts:
+                add([-x, p])
+            add([x] + [-p for p in parts])
+        elif isinstance(sentence, Or):
+            if not sentence.disjuncts:
+                return self.constant(False)
+            parts = [self.literal(d) for d in sentence.disjuncts]
+            x = self.solver.new_var()
+            for p in parts:
+                add([x, -p])
+            add([-x] + parts)
+        elif isinstance(sentence, Implication):
+            a = self.literal(sentence.antecedent)
+            b = self.literal(sentence.consequent)
+            x = self.solver.new_var()
+            add([-x, -a, b])
+            add([x, a])
+            add([x, -b])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            x = self.solver.new_var()
+            add([-x, -a, b])
+            add([-x, a, -b])
+            add([x, a, b])
+            add([x, -a, -b])
+        else:
+            raise TypeError("must be a logical sentence")
+        if sentence.frozen:
+            self.literals[sentence] = x
+        return x
+
+    def add(self, sentence, guard=None):
+        """
+        Asserts sentence, splitting conjunctions and writing top-level
+        disjunctions, implications and biconditionals as plain clauses.
+
+        With a guard literal, every clause asserted also holds when guard
+        is false, so the sentence only applies while guard is assumed.
+        The clauses defining subsentences need no guard.
+        """
+        def add(clause):
+            self.solver.add_clause(clause if guard is None else clause + [-guard])
+
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct, guard)
+        elif isinstance(sentence, Or):
+            add([self.literal(d) for d in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            add([-self.literal(sentence.antecedent),
+                 self.literal(sentence.consequent)])
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            add([-a, b])
+            add([a, -b])
+        else:
+            add([self.literal(sentence)])
+
+    def model(self):
+        """Returns the symbol values of the solver's last model."""
+        return {name: self.solver.model[v]
+                for name, v in self.variables.items()}
+
+
+def entails(knowledge, query):
+    """Checks if knowledge base entails query with the SAT solver."""
+    encoder = Encoder()
+    encoder.add(knowledge)
+    return not encoder.solver.solve([-encoder.literal(query)])
+
+
+def entailments(knowledge, queries):
+    """
+    Returns ENTAILED, CONTRADICTED or UNKNOWN for each query, as
+    logic.entailments does, solving with one encoding of knowledge.
+    """
+    encoder = Encoder()
+    encoder.add(knowledge)
+    solver = encoder.solver
+    results = []
+    for query in queries:
+        literal = encoder.literal(query)
+        if not solver.solve([-literal]):
+            results.append(ENTAILED)
+        elif not solver.solve([literal]):
+            results.append(CONTRADICTED)
+        else:
+            results.append(UNKNOWN)
+    return results
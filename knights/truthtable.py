@@ -0,0 +1,126 @@
+"""
+NumPy truth-table backend for model_check
+
+Instead of trying models one at a time, every sentence is evaluated on a
+whole block of models at once: a symbol becomes a packed bit vector with
+bit k set when the symbol is true in model k, and the connectives become
+bitwise operations on uint64 arrays. Models are numbered so that symbol
+i is true in model k exactly when bit i of k is set.
+
+The model space is split into chunks of 2 ** CHUNK_BITS models, so the
+memory used stays bounded however many symbols there are.
+"""
+
+import numpy as np
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# log2 of the number of models evaluated together; a vector over a
+# chunk takes 2 ** CHUNK_BITS / 8 bytes (128 KiB)
+CHUNK_BITS = 20
+
+# Word with every bit set
+ALL_SET = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Bits of a 64-model word where each of the first six symbols is true
+WORD_PATTERNS = (
+    0xAAAAAAAAAAAAAAAA,
+    0xCCCCCCCCCCCCCCCC,
+    0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00,
+    0xFFFF0000FFFF0000,
+    0xFFFFFFFF00000000,
+)
+
+
+def symbol_vectors(count, chunk_bits):
+    """
+    Returns the vectors of the first `count` symbols over a chunk of
+    2 ** chunk_bits models, for 6 <= chunk_bits and count <= chunk_bits.
+    """
+    words = 1 << (chunk_bits - 6)
+    index = np.arange(words, dtype=np.uint64)
+    vectors = []
+    for i in range(count):
+        if i < 6:
+            vectors.append(np.full(words, WORD_PATTERNS[i], dtype=np.uint64))
+        else:
+
+            # All ones in words whose index has bit i - 6 set
+            bit = (index >> np.uint64(i - 6)) & np.uint64(1)
+            vectors.append(np.uint64(0) - bit)
+    return vectors
+
+
+def evaluate(sentence, vectors):
+    """
+    Returns the packed truth values of sentence, given the vectors of
+    its symbols by name.
+
+    The result may be one of the symbol vectors, so callers copy it
+    before changing it in place.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return vectors[sentence.name]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    if isinstance(sentence, Not):
+        return ~evaluate(sentence.operand, vectors)
+    if isinstance(sentence, And):
+        return combine(sentence.conjuncts, vectors, np.bitwise_and, True)
+    if isinstance(sentence, Or):
+        return combine(sentence.disjuncts, vectors, np.bitwise_or, False)
+    if isinstance(sentence, Implication):
+        result = ~evaluate(sentence.antecedent, vectors)
+        result |= evaluate(sentence.consequent, vectors)
+        return result
+    if isinstance(sentence, Biconditional):
+        result = np.bitwise_xor(evaluate(sentence.left, vectors),
+                                evaluate(sentence.right, vectors))
+        return np.invert(result, out=result)
+    raise TypeError("must be a logical sentence")
+
+
+def combine(sentences, vectors, operation, empty):
+    """
+    Returns the vectors of sentences folded with a bitwise operation,
+    reusing one array for the result.
+    """
+    if not sentences:
+        words = len(next(iter(vectors.values()))) if vectors else 1
+        return np.full(words, ALL_SET if empty else 0, dtype=np.uint64)
+    result = evaluate(sentences[0], vectors)
+    for i, sentence in enumerate(sentences[1:]):
+        if i == 0:
+            result = operation(result, evaluate(sentence, vectors))
+        else:
+            operation(result, evaluate(sentence, vectors), out=result)
+    return result
+
+
+def entails(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge base entails query, testing a chunk of
+    2 ** chunk_bits models at a time, and at least 64.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    chunk_bits = max(6, min(chunk_bits, len(symbols)))
+    low = min(len(symbols), chunk_bits)
+    low_vectors = symbol_vectors(low, chunk_bits)
+    words = 1 << (chunk_bits - 6)
+    ones = np.full(words, ALL_SET, dtype=np.uint64)
+    zeros = np.zeros(words, dtype=np.uint64)
+
+    for chunk in range(1 << (len(symbols) - low)):
+
+        # Symbols past the chunk's own bits are constant within it
+        vectors = dict(zip(symbols, low_vectors))
+        for i, name in enumerate(symbols[low:]):
+            vectors[name] = ones if chunk >> i & 1 else zeros
+
+        counterexamples = ~evaluate(query, vectors)
+        counterexamples &= evaluate(knowledge, vectors)
+        if counterexamples.any():
+            return False
+    return True
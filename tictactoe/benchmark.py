@@ -0,0 +1,171 @@
+import sys
+import time
+
+import bitboard
+import mnk
+import tictactoe as ttt
+
+
+USAGE = "Usage: python benchmark.py [verify|mnk]"
+
+
+def main():
+    if len(sys.argv) > 2 or sys.argv[1:] not in ([], ["verify"], ["mnk"]):
+        sys.exit(USAGE)
+    if sys.argv[1:] == ["verify"]:
+        verify_alpha_beta()
+        return
+    if sys.argv[1:] == ["mnk"]:
+        mnk_self_play()
+        return
+    first_move()
+    print()
+    full_tree_searches()
+
+
+def first_move():
+    """
+    Times each minimax variant on the empty board and prints the number
+    of maxValue/minValue calls (search nodes) each makes.
+    """
+    searches = (
+        ("plain", lambda board: ttt.minimax(board, False, False)),
+        ("alpha-beta", ttt.minimaxAlphaBeta),
+        ("transpositions (cold)", lambda board: ttt.minimax(board, True, False)),
+        ("transpositions (warm)", lambda board: ttt.minimax(board, True, False)),
+        ("opening book", ttt.minimax),
+    )
+    print(f"{'search':<24}{'calls':>10}{'ms':>10}{'move':>8}")
+    for search, minimax in searches:
+        ttt.calls = 0
+        start = time.perf_counter()
+        move = minimax(ttt.initial_state())
+        elapsed = time.perf_counter() - start
+        print(f"{search:<24}{ttt.calls:>10}{1000 * elapsed:>10.1f}"
+              f"{str(move):>8}")
+
+
+def full_tree_searches(seconds=3):
+    """
+    Prints how many complete, unpruned game-tree searches from the empty
+    board each engine manages per second.
+    """
+    engines = (
+        ("lists", lambda: ttt.maxValue(ttt.initial_state(), memo=False)),
+        ("bitboard", lambda: bitboard.negamax(0, 0)),
+    )
+    print(f"{'engine':<24}{'searches/s':>12}{'nodes/s':>12}")
+    for engine, search in engines:
+        ttt.calls = bitboard.nodes = 0
+        searches = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            search()
+            searches += 1
+        elapsed = time.perf_counter() - start
+        visited = ttt.calls + bitboard.nodes
+        print(f"{engine:<24}{searches / elapsed:>12.2f}"
+              f"{visited / elapsed:>12.0f}")
+
+
+def mnk_self_play(time_limit=1.0, max_moves=12):
+    """
+    Lets the m,n,k engine play itself on each board size and prints the
+    average depth its iterative deepening completes, nodes searched per
+    second and the slowest move, which the time limit should bound.
+    """
+    print(f"{'board':<12}{'moves':>8}{'depth':>8}{'nodes/s':>12}{'max ms':>10}")
+    for m, n, k in ((3, 3, 3), (4, 4, 3), (5, 5, 4), (15, 15, 5)):
+        game = mnk.Game(m, n, k, time_limit)
+        board = game.initial_state()
+        moves = depth = nodes = 0
+        elapsed = slowest = 0
+        while not game.terminal(board) and moves < max_moves:
+            start = time.perf_counter()
+            move = game.minimax(board)
+            took = time.perf_counter() - start
+            board = game.result(board, move)
+            moves += 1
+            depth += game.depth
+            nodes += game.nodes
+            elapsed += took
+            slowest = max(slowest, took)
+        label = f"{m}x{n} k={k}"
+        print(f"{label:<12}{moves:>8}{depth / moves:>8.1f}"
+              f"{nodes / elapsed:>12.0f}{1000 * slowest:>10.0f}")
+
+
+def reachable_positions():
+    """
+    Returns every non-terminal position reachable from the empty board.
+    """
+    positions = {}
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        key = ttt.board_key(board)
+        if key in positions or ttt.terminal(board):
+            continue
+        positions[key] = board
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return list(positions.values())
+
+
+def value(board):
+    """Returns the exact minimax value of a position."""
+    if ttt.player(board) == ttt.X:
+        return ttt.maxValue(board)
+    return ttt.minValue(board)
+
+
+def verify_alpha_beta():
+    """
+    Checks over every reachable position that minimaxAlphaBeta, the
+    bitboard engine and the opening book pick a move worth exactly as much
+    as the one minimax picks, that minimax still searches when the book
+    has no entry, and prints the search nodes minimax and alpha-beta need.
+    """
+    positions = reachable_positions()
+    plain = pruned = 0
+    for board in positions:
+        ttt.calls = 0
+        expected = ttt.minimax(board, memo=False, use_book=False)
+        plain += ttt.calls
+
+        ttt.calls = 0
+        move = ttt.minimaxAlphaBeta(board)
+        pruned += ttt.calls
+
+        if value(ttt.result(board, move)) != value(ttt.result(board, expected)):
+            sys.exit(f"alpha-beta picked {move} over {expected} on {board}")
+
+        move = bitboard.minimax(board)
+        if value(ttt.result(board, move)) != value(ttt.result(board, expected)):
+            sys.exit(f"bitboard picked {move} over {expected} on {board}")
+
+        move = ttt.book_move(board)
+        if value(ttt.result(board, move)) != value(ttt.result(board, expected)):
+            sys.exit(f"opening book picked {move} over {expected} on {board}")
+
+    # Boards the book has no entry for must fall back to searching
+    book = ttt.book
+    try:
+        ttt.book = b""
+        if ttt.minimax(ttt.initial_state()) is None:
+            sys.exit("minimax gave no move without an opening book")
+    finally:
+        ttt.book = book
+    unreachable = [[ttt.O, ttt.O, None], [None, ttt.X, None], [None, None, None]]
+    move = ttt.minimax(unreachable)
+    expected = ttt.minimax(unreachable, use_book=False)
+    if move is None or (value(ttt.result(unreachable, move))
+                        != value(ttt.result(unreachable, expected))):
+        sys.exit(f"minimax picked {move} over {expected} on a book miss")
+    print(f"{len(positions)} positions verified.")
+    print(f"minimax nodes:    {plain}")
+    print(f"alpha-beta nodes: {pruned}")
+
+
+if __name__ == "__main__":
+    main()
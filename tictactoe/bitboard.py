@@ -0,0 +1,221 @@
+"""
+Tic Tac Toe Player on bitboards
+
+Each side's marks are a 9-bit integer, bit 3 * i + j standing for cell
+(i, j). The functions at the bottom take and return the same list-of-lists
+boards as tictactoe.py, so runner.py can import this module in its place.
+"""
+
+import math
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Bit masks of the 8 winning lines
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,    # Rows
+    0b001001001, 0b010010010, 0b100100100,    # Columns
+    0b100010001, 0b001010100,                 # Diagonals
+)
+
+# Bit masks of the cells in the order they are worth trying:
+# center, corners, then edges
+MOVE_ORDER = tuple(1 << k for k in (4, 0, 2, 6, 8, 1, 3, 5, 7))
+
+# Maps (x, o) positions to their value for the side to move
+transpositions = {}
+
+# Number of positions visited by negamax, for benchmarking
+nodes = 0
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+def has_won(bits):
+    """Returns True if the marks in bits complete any line."""
+    for mask in WIN_MASKS:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def x_to_move(x, o):
+    """Returns True if X has the next turn."""
+    return popcount(x) <= popcount(o)
+
+
+def moves(x, o):
+    """Yields the bit of every empty cell, lowest first."""
+    empty = FULL & ~(x | o)
+    while empty:
+        move = empty & -empty
+        yield move
+        empty ^= move
+
+
+def negamax(mover, other):
+    """
+    Returns the value of the position for the side to move (1 win,
+    0 draw, -1 loss), searching the full game tree.
+
+    `mover` holds the marks of the side to move, `other` the marks of
+    the side that just moved.
+    """
+    global nodes
+    nodes += 1
+    if has_won(other):
+        return -1
+    empty = FULL & ~(mover | other)
+    if not empty:
+        return 0
+
+    best = -1
+    while empty:
+        move = empty & -empty
+        empty ^= move
+        score = -negamax(other, mover | move)
+        if score > best:
+            best = score
+    return best
+
+
+def negamax_memo(mover, other):
+    """
+    Same as negamax, but saving every position's value in the
+    transposition table.
+    """
+    key = (mover, other)
+    if key in transpositions:
+        return transpositions[key]
+    if has_won(other):
+        value = -1
+    elif mover | other == FULL:
+        value = 0
+    else:
+        value = -1
+        for move in MOVE_ORDER:
+            if (mover | other) & move:
+                continue
+            value = max(value, -negamax_memo(other, mover | move))
+            if value == 1:
+                break
+    transpositions[key] = value
+    return value
+
+
+def best_move(x, o):
+    """
+    Returns the bit of the best move for the side to move, or None if
+    the game is over.
+    """
+    if has_won(x) or has_won(o) or x | o == FULL:
+        return None
+    mover, other = (x, o) if x_to_move(x, o) else (o, x)
+    best, best_score = None, -math.inf
+    for move in MOVE_ORDER:
+        if (x | o) & move:
+            continue
+        score = -negamax_memo(other, mover | move)
+        if score > best_score:
+            best, best_score = move, score
+    return best
+
+
+def encode(board):
+    """Returns the (x, o) bitboards of a list-of-lists board."""
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """Returns the list-of-lists board of (x, o) bitboards."""
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return decode(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    return X if x_to_move(*encode(board)) else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = encode(board)
+    return {divmod(move.bit_length() - 1, 3) for move in moves(x, o)}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    x, o = encode(board)
+    move = 1 << (3 * action[0] + action[1])
+    if (x | o) & move:
+        raise Exception("Invalid Action!!")
+    if x_to_move(x, o):
+        return decode(x | move, o)
+    return decode(x, o | move)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = encode(board)
+    if has_won(x):
+        return X
+    if has_won(o):
+        return O
+    return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = encode(board)
+    return has_won(x) or has_won(o) or x | o == FULL
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = encode(board)
+    if has_won(x):
+        return 1
+    if has_won(o):
+        return -1
+    return 0
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    move = best_move(*encode(board))
+    if move is None:
+        return None
+    return divmod(move.bit_length() - 1, 3)
@@ -0,0 +1,44 @@
+import sys
+
+import tictactoe as ttt
+
+
+def main():
+    if len(sys.argv) != 1:
+        sys.exit("Usage: python book.py")
+    entries = build()
+    with open(ttt.BOOK_FILE, "wb") as f:
+        f.write(entries)
+    solved = len(entries) - entries.count(ttt.NO_MOVE)
+    print(f"Solved {solved} positions into {ttt.BOOK_FILE}.")
+
+
+def build():
+    """
+    Solves every position reachable from the empty board with minimax
+    and returns the opening book entries as bytes.
+    """
+    entries = bytearray([ttt.NO_MOVE]) * ttt.BOOK_SIZE
+    seen = set()
+    stack = [ttt.initial_state()]
+    while stack:
+        board = stack.pop()
+        index = ttt.book_index(board)
+        if index in seen or ttt.terminal(board):
+            continue
+        seen.add(index)
+
+        i, j = ttt.minimax(board, use_book=False)
+        if ttt.player(board) == ttt.X:
+            value = ttt.maxValue(board)
+        else:
+            value = ttt.minValue(board)
+        entries[index] = (value + 1) << 4 | (3 * i + j)
+
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+    return bytes(entries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import random
+import statistics
+import sys
+import time
+from multiprocessing import Pool
+
+import bitboard
+import tictactoe as ttt
+
+USAGE = """Usage: python harness.py perft [depth] [position]
+       python harness.py play [games] [engine] [workers]"""
+
+# Positions reached at each depth from the empty board, games that end
+# early not counted further; perft checks the move generator against them
+PERFT_EMPTY = (1, 9, 72, 504, 3024, 15120, 54720, 148176, 200448, 127872)
+
+# Engines the games can be played with, by name
+ENGINES = {
+    "book": lambda board: ttt.minimax(board),
+    "memo": lambda board: ttt.minimax(board, use_book=False),
+    "plain": lambda board: ttt.minimax(board, memo=False, use_book=False),
+    "alphabeta": ttt.minimaxAlphaBeta,
+    "bitboard": bitboard.minimax,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("perft", "play"):
+        sys.exit(USAGE)
+    if sys.argv[1] == "perft":
+        if len(sys.argv) > 4:
+            sys.exit(USAGE)
+        depth = int(sys.argv[2]) if len(sys.argv) >= 3 else 9
+        board = parse_position(sys.argv[3]) if len(sys.argv) == 4 \
+            else ttt.initial_state()
+        report_perft(board, depth)
+        return
+
+    if len(sys.argv) > 5:
+        sys.exit(USAGE)
+    games = int(sys.argv[2]) if len(sys.argv) >= 3 else 1000
+    engine = sys.argv[3] if len(sys.argv) >= 4 else "memo"
+    workers = int(sys.argv[4]) if len(sys.argv) == 5 else None
+    if games < 1:
+        sys.exit("Play at least one game")
+    if engine not in ENGINES:
+        sys.exit(f"Unknown engine, choose from: {', '.join(ENGINES)}")
+    ttt.load_book()
+    for opponent in ("ai", "random"):
+        report_games(games, engine, opponent, workers)
+        print()
+
+
+def parse_position(text):
+    """
+    Returns the board written as 9 characters row by row, X, O or . for
+    an empty cell, such as "X...O...." .
+    """
+    if len(text) != 9 or set(text) - set("XO."):
+        sys.exit("Position must be 9 characters of X, O and .")
+    cells = [None if c == "." else c for c in text]
+    return [cells[0:3], cells[3:6], cells[6:9]]
+
+
+def perft(board, depth):
+    """
+    Returns the number of positions reached after exactly `depth` moves
+    from board, not continuing past games that are over.
+    """
+    if depth == 0:
+        return 1
+    if ttt.terminal(board):
+        return 0
+    return sum(perft(ttt.result(board, action), depth - 1)
+               for action in ttt.actions(board))
+
+
+def report_perft(board, depth):
+    """
+    Prints perft counts and positions per second for every depth up to
+    `depth`, exiting if a count from the empty board is not the known one.
+    """
+    empty = board == ttt.initial_state()
+    print(f"{'depth':>6}{'positions':>12}{'positions/s':>14}")
+    for d in range(1, depth + 1):
+        start = time.perf_counter()
+        count = perft(board, d)
+        elapsed = time.perf_counter() - start
+        print(f"{d:>6}{count:>12}{count / elapsed:>14.0f}")
+        if empty and d < len(PERFT_EMPTY) and count != PERFT_EMPTY[d]:
+            sys.exit(f"perft({d}) should be {PERFT_EMPTY[d]}")
+
+
+def play_game(job):
+    """
+    Plays one game and returns its winner, the side the engine played
+    (None when it played both), the engine's move latencies in seconds
+    and the number of moves.
+
+    Against random, the engine plays X in even-numbered games and O in
+    odd ones.
+    """
+    number, engine, opponent = job
+    rng = random.Random(number)
+    search = ENGINES[engine]
+    ai = None if opponent == "ai" else (ttt.X if number % 2 == 0 else ttt.O)
+    latencies = []
+    board = ttt.initial_state()
+    moves = 0
+    while not ttt.terminal(board):
+        if ai is None or ttt.player(board) == ai:
+            start = time.perf_counter()
+            action = search(board)
+            latencies.append(time.perf_counter() - start)
+        else:
+            action = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, action)
+        moves += 1
+    return ttt.winner(board), ai, latencies, moves
+
+
+def report_games(games, engine, opponent, workers=None):
+    """
+    Plays `games` games of the engine against itself or a random player
+    across a process pool and prints positions per second, move latency
+    percentiles and the outcomes.
+
+    Perfect play never loses, and always draws against itself; the
+    report ends with an error if any game says otherwise.
+    """
+    workers = workers or os.cpu_count()
+    jobs = [(number, engine, opponent) for number in range(games)]
+    outcomes = {"win": 0, "draw": 0, "loss": 0}
+    latencies = []
+    positions = 0
+
+    start = time.perf_counter()
+    with Pool(workers, initializer=ttt.load_book) as pool:
+        chunksize = max(1, games // (4 * workers))
+        for winner, ai, times, moves in pool.imap_unordered(
+                play_game, jobs, chunksize):
+            latencies.extend(times)
+            positions += moves
+            if winner is None:
+                outcomes["draw"] += 1
+            elif winner == ai:
+                outcomes["win"] += 1
+            else:
+                outcomes["loss"] += 1
+    elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(f"{engine} vs {opponent}: {games} games in {elapsed:.2f}s, "
+          f"{positions / elapsed:.0f} positions/s")
+    print(f"{'latency':<10}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}"
+          f"{'max':>10}")
+    print(f"{'ms':<10}{1000 * statistics.fmean(latencies):>10.3f}"
+          f"{1000 * cuts[49]:>10.3f}{1000 * cuts[89]:>10.3f}"
+          f"{1000 * cuts[98]:>10.3f}{1000 * max(latencies):>10.3f}")
+    print(f"wins {outcomes['win']}, draws {outcomes['draw']}, "
+          f"losses {outcomes['loss']}")
+    if outcomes["loss"]:
+        sys.exit(f"{engine} lost {outcomes['loss']} games")
+
+
+if __name__ == "__main__":
+    main()
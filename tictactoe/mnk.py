@@ -0,0 +1,338 @@
+"""
+m,n,k-game Player
+
+Tic-tac-toe generalized to m rows, n columns and k in a row to win, such
+as 4x4, 5x5 or gomoku's 15x15 with k = 5. Boards are the same lists of
+lists as in tictactoe.py, and a Game offers the same functions as that
+module, so runner.py can use either one.
+
+Full minimax is out of reach on the larger boards, so minimax runs an
+iterative-deepening alpha-beta search under a time budget and scores the
+positions it cannot search to the end with a heuristic.
+"""
+
+import math
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position; wins found sooner score higher
+WIN = 1000000
+
+# Row, column steps of the four line directions
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    An m,n,k-game: m rows, n columns, k marks in a row win.
+    """
+
+    X = X
+    O = O
+    EMPTY = EMPTY
+
+    def __init__(self, m=3, n=3, k=3, time_limit=1.0):
+        if not 1 <= k <= max(m, n):
+            raise ValueError("win length must fit on the board")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Seconds minimax may spend on one move
+        self.time_limit = time_limit
+
+        # Every run of k cells in a line, as flat indices i * n + j,
+        # and for every cell the runs that pass through it
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in DIRECTIONS:
+                    end_i = i + (k - 1) * di
+                    end_j = j + (k - 1) * dj
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(tuple(
+                            (i + s * di) * n + (j + s * dj) for s in range(k)
+                        ))
+        self.cell_windows = [[] for _ in range(m * n)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+
+        # Value of an open run holding c marks of one side only
+        self.weights = [0] + [10 ** c for c in range(1, k)]
+
+        # Cells from the center outwards, the static move order
+        center_i, center_j = (m - 1) / 2, (n - 1) / 2
+        self.center_order = sorted(
+            range(m * n),
+            key=lambda c: (abs(c // n - center_i) + abs(c % n - center_j), c)
+        )
+
+        # Positions visited by the last minimax call and the depth it
+        # completed, for benchmarking
+        self.nodes = 0
+        self.depth = 0
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        x = sum(row.count(X) for row in board)
+        o = sum(row.count(O) for row in board)
+        return X if x <= o else O
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] == EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if board[i][j] != EMPTY:
+            raise Exception("Invalid Action!!")
+        new_board = [row[:] for row in board]
+        new_board[i][j] = self.player(board)
+        return new_board
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        cells = [cell for row in board for cell in row]
+        for window in self.windows:
+            mark = cells[window[0]]
+            if mark != EMPTY and all(cells[c] == mark for c in window):
+                return mark
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        if self.winner(board) is not None:
+            return True
+        return all(cell != EMPTY for row in board for cell in row)
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        mark = self.winner(board)
+        return 1 if mark == X else -1 if mark == O else 0
+
+    def minimax(self, board, time_limit=None, max_depth=None, stop=None):
+        """
+        Returns the best action found for the current player on the board.
+
+        Searches one ply deeper each round until `time_limit` seconds
+        (the game's time_limit by default) run out, `max_depth` is
+        reached, the outcome is certain or the `stop` event (a
+        threading.Event) is set, and returns the best move of the deepest
+        round that finished. The first round always finishes.
+        """
+        if self.terminal(board):
+            return None
+        if time_limit is None:
+            time_limit = self.time_limit
+        position = Position(self, board)
+        side = 0 if self.player(board) == X else 1
+        max_depth = min(max_depth or position.empties, position.empties)
+
+        self.nodes = 0
+        self.depth = 0
+        self.deadline = None
+        self.stop = stop
+        started = time.perf_counter()
+        moves = self.candidates(position)
+        best = moves[0]
+        if len(moves) == 1:
+            return divmod(best, self.n)
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move, scores = self.search_root(
+                    position, side, depth, moves
+                )
+            except SearchTimeout:
+                break
+            best = move
+            self.depth = depth
+
+            # Search the best moves of this round first in the next one
+            moves.sort(key=lambda move: -scores[move])
+            if abs(score) >= WIN - self.m * self.n:
+                break
+            self.deadline = started + time_limit
+            if self.out_of_time():
+                break
+        return divmod(best, self.n)
+
+    def search_root(self, position, side, depth, moves):
+        """
+        Searches every root move to `depth` plies and returns the best
+        score, the best move and the score of each move.
+        """
+        alpha, beta = -math.inf, math.inf
+        best_score, best_move = -math.inf, moves[0]
+        scores = {}
+        for move in moves:
+            won = position.place(move, side)
+            try:
+                if won:
+                    score = WIN
+                else:
+                    score = -self.negamax(position, 1 - side, depth - 1,
+                                          -beta, -alpha, 1)
+            finally:
+                position.undo(move, side)
+            scores[move] = score
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+        return best_score, best_move, scores
+
+    def negamax(self, position, side, depth, alpha, beta, ply):
+        """
+        Returns the alpha-beta value of the position for `side`, who is
+        to move, searching `depth` more plies.
+        """
+        self.nodes += 1
+        if (self.deadline is not None and self.nodes & 1023 == 0
+                and self.out_of_time()):
+            raise SearchTimeout
+        if position.empties == 0:
+            return 0
+        if depth == 0:
+            return position.score if side == 0 else -position.score
+
+        best = -math.inf
+        for move in self.candidates(position):
+            won = position.place(move, side)
+            try:
+                if won:
+                    score = WIN - ply
+                else:
+                    score = -self.negamax(position, 1 - side, depth - 1,
+                                          -beta, -alpha, ply + 1)
+            finally:
+                position.undo(move, side)
+            if score > best:
+                best = score
+                if best >= beta:
+                    return best
+                alpha = max(alpha, best)
+        return best
+
+    def out_of_time(self):
+        """Returns True if the search must stop now."""
+        if self.stop is not None and self.stop.is_set():
+            return True
+        return time.perf_counter() >= self.deadline
+
+    def candidates(self, position):
+        """
+        Returns the empty cells worth searching, center first.
+
+        On boards larger than 5x5 only cells within two steps of a mark
+        are considered, as moves far from every mark are never better.
+        """
+        cells = position.cells
+        moves = [c for c in self.center_order if cells[c] == EMPTY]
+        if self.m * self.n <= 25:
+            return moves
+        if position.empties == self.m * self.n:
+            return moves[:1]
+        near = set()
+        for c, mark in enumerate(cells):
+            if mark == EMPTY:
+                continue
+            i, j = divmod(c, self.n)
+            for r in range(max(0, i - 2), min(self.m, i + 3)):
+                for s in range(max(0, j - 2), min(self.n, j + 3)):
+                    near.add(r * self.n + s)
+        return [c for c in moves if c in near]
+
+
+class Position():
+    """
+    Mutable flat board used during search.
+
+    Keeps how many X and O marks lie in each run of k cells, and from
+    those the heuristic score from X's point of view: open runs count
+    for the only side with marks in them, 10 ** marks each. Moves and
+    undos update only the runs through the cell that changed.
+    """
+
+    def __init__(self, game, board):
+        self.game = game
+        self.cells = [cell for row in board for cell in row]
+        self.counts = ([0] * len(game.windows), [0] * len(game.windows))
+        self.score = 0
+        self.empties = self.cells.count(EMPTY)
+        for c, mark in enumerate(self.cells):
+            if mark != EMPTY:
+                self.count(c, 0 if mark == X else 1, 1)
+
+    def value(self, w):
+        x, o = self.counts[0][w], self.counts[1][w]
+        if x and o:
+            return 0
+        weights = self.game.weights
+        return weights[x] if x else -weights[o] if o else 0
+
+    def count(self, cell, side, step):
+        """
+        Adds `step` marks of `side` to every run through cell and returns
+        True if one of them becomes a full run.
+        """
+        won = False
+        counts = self.counts[side]
+        k = self.game.k
+        for w in self.game.cell_windows[cell]:
+            if counts[w] + step == k:
+                won = True
+                self.score -= self.value(w)
+                counts[w] += step
+                continue
+            self.score -= self.value(w)
+            counts[w] += step
+            self.score += self.value(w)
+        return won
+
+    def place(self, cell, side):
+        """Puts side's mark on cell; returns True if it wins."""
+        self.cells[cell] = X if side == 0 else O
+        self.empties -= 1
+        return self.count(cell, side, 1)
+
+    def undo(self, cell, side):
+        """Takes side's mark back off cell."""
+        self.cells[cell] = EMPTY
+        self.empties += 1
+        counts = self.counts[side]
+        k = self.game.k
+        for w in self.game.cell_windows[cell]:
+            if counts[w] == k:
+                counts[w] -= 1
+                self.score += self.value(w)
+                continue
+            self.score -= self.value(w)
+            counts[w] -= 1
+            self.score += self.value(w)
@@ -1,11 +1,13 @@
 import pygame
 import sys
+import threading
 import time
 
+import mnk
 import tictactoe as ttt
 
 pygame.init()
-size = width, height = 600, 400
+size = width, height = 600, 600
 
 # Colors
 black = (0, 0, 0)
@@ -15,17 +17,70 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+moveFontSize = 60
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", moveFontSize)
+
+# Board sizes to choose from: 3x3 plays perfectly from the opening book,
+# the larger boards search for at most AI_TIME seconds per move
+AI_TIME = 1.0
+GAMES = (
+    ("3x3", ttt),
+    ("4x4", mnk.Game(4, 4, 3, AI_TIME)),
+    ("5x5", mnk.Game(5, 5, 4, AI_TIME)),
+    ("15x15", mnk.Game(15, 15, 5, AI_TIME)),
+)
+game = ttt
+
+# Shortest time the "thinking" title shows before the AI moves
+AI_DELAY = 0.5
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+
+# Background search for the AI move: the thread, the event that tells it
+# to stop early, the list it puts its move in and when it started
+ai_thread = None
+ai_stop = None
+ai_reply = None
+ai_started = None
+
+# Set when the search gave no move, which ends the game with an error
+ai_failed = False
+
+
+def think(game, board, stop, reply):
+    """
+    Runs in the AI thread: searches board and appends the move to reply,
+    leaving reply empty if the search fails.
+    """
+    try:
+        if isinstance(game, mnk.Game):
+            reply.append(game.minimax(board, stop=stop))
+        else:
+            reply.append(game.minimax(board))
+    except Exception as e:
+        print(f"AI search failed: {e}", file=sys.stderr)
+
+
+# Read the opening book now so the first AI move is a plain lookup
+ttt.load_book()
+
+# Cap the frame rate so drawing leaves the AI thread most of the CPU
+clock = pygame.time.Clock()
 
 while True:
+    clock.tick(30)
 
+    # Where the mouse was pressed this frame, for buttons that must not
+    # fire again while it is held down
+    pressed = None
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            if ai_thread is not None:
+                ai_stop.set()
             sys.exit()
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            pressed = event.pos
 
     screen.fill(black)
 
@@ -38,6 +93,21 @@ while True:
         titleRect.center = ((width / 2), 50)
         screen.blit(title, titleRect)
 
+        # Draw board size buttons, the chosen one filled in
+        sizeButtons = []
+        for index, (label, option) in enumerate(GAMES):
+            sizeButton = pygame.Rect((index + 0.5) * (width / 4) - 60, height / 3, 120, 50)
+            if option is game:
+                pygame.draw.rect(screen, white, sizeButton)
+                sizeText = mediumFont.render(label, True, black)
+            else:
+                pygame.draw.rect(screen, white, sizeButton, 3)
+                sizeText = mediumFont.render(label, True, white)
+            sizeRect = sizeText.get_rect()
+            sizeRect.center = sizeButton.center
+            screen.blit(sizeText, sizeRect)
+            sizeButtons.append((sizeButton, option))
+
         # Draw buttons
         playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
         playX = mediumFont.render("Play as X", True, black)
@@ -60,28 +130,37 @@ while True:
             if playXButton.collidepoint(mouse):
                 time.sleep(0.2)
                 user = ttt.X
+                board = game.initial_state()
             elif playOButton.collidepoint(mouse):
                 time.sleep(0.2)
                 user = ttt.O
+                board = game.initial_state()
+            for sizeButton, option in sizeButtons:
+                if sizeButton.collidepoint(mouse):
+                    game = option
 
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size), height / 2 - (1.5 * tile_size))
+        rows, cols = len(board), len(board[0])
+        tile_size = min(80, (height - 160) // rows, (width - 40) // cols)
+        tile_origin = (width / 2 - (cols / 2 * tile_size), height / 2 - (rows / 2 * tile_size))
+        if moveFontSize != tile_size * 3 // 4:
+            moveFontSize = tile_size * 3 // 4
+            moveFont = pygame.font.Font("OpenSans-Regular.ttf", moveFontSize)
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
                     tile_size,
                     tile_size,
                 )
-                pygame.draw.rect(screen, white, rect, 3)
+                pygame.draw.rect(screen, white, rect, 3 if tile_size > 40 else 1)
 
-                if board[i][j] != ttt.EMPTY:
+                if board[i][j] != game.EMPTY:
                     move = moveFont.render(board[i][j], True, white)
                     moveRect = move.get_rect()
                     moveRect.center = rect.center
@@ -89,12 +168,14 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board) or ai_failed
+        player = game.player(board)
 
         # Show title
-        if game_over:
-            winner = ttt.winner(board)
+        if ai_failed:
+            title = "Computer failed to move."
+        elif game_over:
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -102,30 +183,55 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            elapsed = time.perf_counter() - ai_started if ai_thread else 0
+            title = f"Computer thinking{'.' * (int(2 * elapsed) % 4):<3} {elapsed:.1f}s"
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Start the AI search in the background, and play its move once
+        # it is ready and the thinking title has shown for AI_DELAY
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_thread is None:
+                ai_stop = threading.Event()
+                ai_reply = []
+                ai_started = time.perf_counter()
+                ai_thread = threading.Thread(
+                    target=think, args=(game, board, ai_stop, ai_reply), daemon=True
+                )
+                ai_thread.start()
+            elif not ai_thread.is_alive() and time.perf_counter() - ai_started >= AI_DELAY:
+                ai_thread = None
+
+                # A search that gives no move is a bug; end the game and
+                # say so rather than play a move nobody chose
+                if ai_reply and ai_reply[0] is not None:
+                    board = game.result(board, ai_reply[0])
+                else:
+                    ai_failed = True
+
+        # Let the user cut the search short. The button sits clear of
+        # Play Again and only reacts to a new press, so a click held
+        # past the end of the game cannot start another one
+        if ai_thread is not None and isinstance(game, mnk.Game):
+            stopButton = pygame.Rect(2 * width / 3 + 10, height - 65, width / 3 - 20, 50)
+            stopText = mediumFont.render("Move Now", True, black)
+            stopRect = stopText.get_rect()
+            stopRect.center = stopButton.center
+            pygame.draw.rect(screen, white, stopButton)
+            screen.blit(stopText, stopRect)
+            if pressed is not None and stopButton.collidepoint(pressed):
+                ai_stop.set()
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse):
-                        board = ttt.result(board, (i, j))
+            for i in range(rows):
+                for j in range(cols):
+                    if board[i][j] == game.EMPTY and tiles[i][j].collidepoint(mouse):
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -140,7 +246,7 @@ while True:
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
                     user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    ai_failed = False
+                    board = game.initial_state()
 
     pygame.display.flip()
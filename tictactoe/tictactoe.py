@@ -3,13 +3,40 @@ Tic Tac Toe Player
 """
 
 import math
-import copy
+import os
 from random import randrange
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Row-major cell orders of the 8 rotations and reflections of the board
+SYMMETRIES = []
+for transform in (
+    lambda i, j: (i, j), lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j), lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j), lambda i, j: (2 - i, j),
+    lambda i, j: (j, i), lambda i, j: (2 - j, 2 - i),
+):
+    SYMMETRIES.append([3 * a + b for a, b in
+                       (transform(i, j) for i in range(3) for j in range(3))])
+
+# Maps canonical board keys to their minimax value
+transpositions = {}
+
+# Number of maxValue/minValue calls made, for benchmarking
+calls = 0
+
+# Opening book written by book.py: one byte per board, indexed by the
+# board read as a base-3 number (EMPTY = 0, X = 1, O = 2). The low four
+# bits hold the best move as 3 * i + j, the next two the value plus one.
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_SIZE = 3 ** 9
+NO_MOVE = 0xFF
+
+# Contents of BOOK_FILE once loaded, b"" if there is none
+book = None
+
 
 def initial_state():
     """
@@ -61,7 +88,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    newBoard = copy.deepcopy(board)
+    newBoard = [row[:] for row in board]
     if board[action[0]][action[1]] == None:
         if player(board) == X:
             # print("player X moved")
@@ -144,61 +171,245 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def board_key(board):
+    """
+    Returns an immutable encoding of the board, one character per cell.
+    """
+    return "".join(cell or "." for row in board for cell in row)
+
+
+def canonical_key(board):
+    """
+    Returns the same key for a board and all its rotations and reflections,
+    so that symmetric positions share one transposition table entry.
+    """
+    key = board_key(board)
+    return min("".join(key[k] for k in order) for order in SYMMETRIES)
+
+
+def load_book():
+    """
+    Reads the opening book on first use and returns its contents.
+    """
+    global book
+    if book is None:
+        try:
+            with open(BOOK_FILE, "rb") as f:
+                book = f.read()
+        except OSError:
+            book = b""
+        if len(book) != BOOK_SIZE:
+            book = b""
+    return book
+
+
+def book_index(board):
+    """
+    Returns the position of the board's entry in the opening book.
+    """
+    index = 0
+    for row in board:
+        for cell in row:
+            index = 3 * index + (0 if cell is None else 1 if cell == X else 2)
+    return index
+
+
+def book_move(board):
+    """
+    Returns the opening book's best action for the board, or None if
+    there is no book or no entry for the board.
+    """
+    entries = load_book()
+    if not entries:
+        return None
+    entry = entries[book_index(board)]
+    if entry == NO_MOVE:
+        return None
+    return divmod(entry & 0xF, 3)
+
+
+def minimax(board, memo=True, use_book=True):
     """
     Returns the optimal action for the current player on the board.
+
+    With `use_book`, the move is read from the opening book when it has
+    an entry for the board, and searched for otherwise. With `memo`,
+    position values are looked up in and saved to the transposition
+    table.
     """
     if terminal(board):
         return None
 
-    else:
-        if player(board) == X:
-            bestScore = -math.inf
-            bestAction = None
+    if use_book:
+        action = book_move(board)
+        if action is not None:
+            return action
 
-            for action in actions(board):
-                newValue = minValue(result(board, action))
+    if player(board) == X:
+        bestScore = -math.inf
+        bestAction = None
 
-                if newValue > bestScore:
-                    bestScore = newValue
-                    bestAction = action
+        for action in actions(board):
+            newValue = minValue(result(board, action), memo)
 
-            return bestAction
-        elif player(board) == O:
-            bestScore = math.inf
-            bestAction = None
+            if newValue > bestScore:
+                bestScore = newValue
+                bestAction = action
+
+        return bestAction
+    elif player(board) == O:
+        bestScore = math.inf
+        bestAction = None
 
-            for action in actions(board):
-                newValue = maxValue(result(board, action))
+        for action in actions(board):
+            newValue = maxValue(result(board, action), memo)
 
-                if newValue < bestScore:
-                    bestScore = newValue
-                    bestAction = action
+            if newValue < bestScore:
+                bestScore = newValue
+                bestAction = action
 
-            return bestAction
+        return bestAction
 
 
-def maxValue(board):
+def maxValue(board, memo=True):
+    global calls
+    calls += 1
     score = -math.inf
 
     if terminal(board):
         # print(utility(board))
         return utility(board)
 
+    if memo:
+        key = canonical_key(board)
+        if key in transpositions:
+            return transpositions[key]
+
     for action in actions(board):
-        score = max(score, minValue(result(board, action)))
+        score = max(score, minValue(result(board, action), memo))
 
+    if memo:
+        transpositions[key] = score
     return score
 
 
-def minValue(board):
+def minValue(board, memo=True):
+    global calls
+    calls += 1
     score = math.inf
 
     if terminal(board):
         # print(utility(board))
         return utility(board)
 
+    if memo:
+        key = canonical_key(board)
+        if key in transpositions:
+            return transpositions[key]
+
     for action in actions(board):
-        score = min(score, maxValue(result(board, action)))
+        score = min(score, maxValue(result(board, action), memo))
 
+    if memo:
+        transpositions[key] = score
+    return score
+
+
+def wins(board, action, mark):
+    """
+    Returns True if placing mark at action would complete a line.
+    """
+    i, j = action
+    lines = [[(i, k) for k in range(3)], [(k, j) for k in range(3)]]
+    if i == j:
+        lines.append([(k, k) for k in range(3)])
+    if i + j == 2:
+        lines.append([(k, 2 - k) for k in range(3)])
+    return any(all(cell == action or board[cell[0]][cell[1]] == mark
+                   for cell in line)
+               for line in lines)
+
+
+def orderedActions(board):
+    """
+    Returns the available actions, most promising first: moves that win
+    at once, then moves that block the opponent's win, then the center,
+    the corners and the edges.
+    """
+    mark = player(board)
+    opponent = O if mark == X else X
+
+    def rank(action):
+        if wins(board, action, mark):
+            return 0
+        if wins(board, action, opponent):
+            return 1
+        if action == (1, 1):
+            return 2
+        if action[0] != 1 and action[1] != 1:
+            return 3
+        return 4
+
+    return sorted(actions(board), key=lambda action: (rank(action), action))
+
+
+def minimaxAlphaBeta(board):
+    """
+    Returns the optimal action for the current player on the board,
+    skipping branches that cannot change the choice (alpha-beta pruning).
+    """
+    if terminal(board):
+        return None
+
+    bestAction = None
+    if player(board) == X:
+        bestScore = -math.inf
+        for action in orderedActions(board):
+            newValue = minValueAlphaBeta(result(board, action),
+                                         bestScore, math.inf)
+            if newValue > bestScore:
+                bestScore = newValue
+                bestAction = action
+    else:
+        bestScore = math.inf
+        for action in orderedActions(board):
+            newValue = maxValueAlphaBeta(result(board, action),
+                                         -math.inf, bestScore)
+            if newValue < bestScore:
+                bestScore = newValue
+                bestAction = action
+    return bestAction
+
+
+def maxValueAlphaBeta(board, alpha, beta):
+    global calls
+    calls += 1
+
+    if terminal(board):
+        return utility(board)
+
+    score = -math.inf
+    for action in orderedActions(board):
+        score = max(score, minValueAlphaBeta(result(board, action),
+                                             alpha, beta))
+        if score >= beta:
+            return score
+        alpha = max(alpha, score)
+    return score
+
+
+def minValueAlphaBeta(board, alpha, beta):
+    global calls
+    calls += 1
+
+    if terminal(board):
+        return utility(board)
+
+    score = math.inf
+    for action in orderedActions(board):
+        score = min(score, maxValueAlphaBeta(result(board, action),
+                                             alpha, beta))
+        if score <= alpha:
+            return score
+        beta = min(beta, score)
     return score